@@ -4,34 +4,40 @@ AIsatoshi V27 - 核心模块
 这是AIsatoshi的核心基础层，提供配置、日志、异常等基础功能。
 
 V27 = 记忆原生 + 进化原生 + 任务继承原生
+
+子模块按需惰性导入（PEP 562）：只有首次访问某个符号时才会
+导入对应模块，短生命周期入口（健康检查等）无需支付全部导入成本。
 """
 
-from .config import Config
-from .logger import Logger
-from .exceptions import (
-    AIsatoshiException,
-    ConfigurationError,
-    StorageError,
-    ServiceError,
-    TaskError
-)
-from .constants import (
-    VERSION,
-    DEFAULT_LOG_LEVEL,
-    DATA_DIR,
-    WORKSPACE_DIR
-)
-
-__all__ = [
-    'Config',
-    'Logger',
-    'AIsatoshiException',
-    'ConfigurationError',
-    'StorageError',
-    'ServiceError',
-    'TaskError',
-    'VERSION',
-    'DEFAULT_LOG_LEVEL',
-    'DATA_DIR',
-    'WORKSPACE_DIR',
-]
+import importlib
+
+# 符号 -> 所在子模块
+_LAZY_IMPORTS = {
+    'Config': '.config',
+    'Logger': '.logger',
+    'AIsatoshiException': '.exceptions',
+    'ConfigurationError': '.exceptions',
+    'StorageError': '.exceptions',
+    'ServiceError': '.exceptions',
+    'TaskError': '.exceptions',
+    'VERSION': '.constants',
+    'DEFAULT_LOG_LEVEL': '.constants',
+    'DATA_DIR': '.constants',
+    'WORKSPACE_DIR': '.constants',
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name):
+    """首次访问时导入符号，并缓存到模块globals避免重复解析"""
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
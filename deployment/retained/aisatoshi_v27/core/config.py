@@ -6,6 +6,7 @@ AIsatoshi V27 - 配置管理
 
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 
 
@@ -14,11 +15,28 @@ class ConfigurationError(Exception):
     pass
 
 
-@dataclass
+# 必需的环境变量及缺失时的错误提示
+_REQUIRED_ENV_VARS = (
+    ("AI_PRIVATE_KEY", "AI_PRIVATE_KEY 环境变量未设置。请在部署时设置此环境变量。"),
+    ("GEMINI_API_KEY", "GEMINI_API_KEY 环境变量未设置。请在部署时设置此环境变量。"),
+    ("TELEGRAM_BOT_TOKEN", "TELEGRAM_BOT_TOKEN 环境变量未设置。请在部署时设置此环境变量。"),
+)
+
+
+def _int(env, key: str, default: int) -> int:
+    """读取整数环境变量，未设置时直接返回默认值（跳过str→int转换）"""
+    raw = env.get(key)
+    return int(raw) if raw else default
+
+
+@dataclass(slots=True, frozen=True)
 class Config:
     """AIsatoshi配置类
 
     所有配置从环境变量读取，确保安全性和灵活性。
+
+    使用slots减少内存占用并加快属性访问；frozen保证
+    共享的单例实例可以安全地在线程间复用。
     """
 
     # 版本信息
@@ -72,8 +90,8 @@ class Config:
     TELEGRAM_GETUPDATES_TIMEOUT: int = 30
 
     # === 区块链配置 ===
-    # 以太坊RPC节点列表
-    ETH_RPC_ENDPOINTS: list = None
+    # 以太坊RPC节点列表（不可变，避免共享实例被意外修改）
+    ETH_RPC_ENDPOINTS: tuple = ()
 
     # === 任务配置 ===
     # 任务检查间隔（秒）
@@ -87,61 +105,48 @@ class Config:
     DAILY_SUMMARY_HOUR: int = 0
 
     @classmethod
+    @lru_cache(maxsize=1)
     def from_env(cls) -> "Config":
         """从环境变量加载配置
 
         这是唯一推荐的配置加载方式。
+
+        结果在进程内缓存：环境变量读取和解析只执行一次，
+        后续调用直接返回同一个Config实例。
         """
+        # 环境变量快照：统一走env.get，避免逐次的os.getenv属性查找
+        env = os.environ
+
         # 检查必需的环境变量
-        ai_private_key = os.getenv("AI_PRIVATE_KEY", "")
-        if not ai_private_key:
-            raise ConfigurationError(
-                "AI_PRIVATE_KEY 环境变量未设置。"
-                "请在部署时设置此环境变量。"
-            )
-
-        gemini_api_key = os.getenv("GEMINI_API_KEY", "")
-        if not gemini_api_key:
-            raise ConfigurationError(
-                "GEMINI_API_KEY 环境变量未设置。"
-                "请在部署时设置此环境变量。"
-            )
-
-        telegram_token = os.getenv("TELEGRAM_BOT_TOKEN", "")
-        if not telegram_token:
-            raise ConfigurationError(
-                "TELEGRAM_BOT_TOKEN 环境变量未设置。"
-                "请在部署时设置此环境变量。"
-            )
-
-        # RPC节点列表
-        rpc_endpoints = os.getenv("ETH_RPC_ENDPOINTS", "").split(",") if os.getenv("ETH_RPC_ENDPOINTS") else [
-            "https://eth.llamarpc.com",
-            "https://rpc.ankr.com/eth",
-            "https://ethereum.publicnode.com",
-            "https://1rpc.io/eth",
-        ]
+        for key, error_msg in _REQUIRED_ENV_VARS:
+            if not env.get(key):
+                raise ConfigurationError(error_msg)
+
+        # RPC节点列表（只查一次ETH_RPC_ENDPOINTS，默认值直接共享常量tuple）
+        from .constants import DEFAULT_RPC_ENDPOINTS
+        rpc_raw = env.get("ETH_RPC_ENDPOINTS")
+        rpc_endpoints = tuple(rpc_raw.split(",")) if rpc_raw else DEFAULT_RPC_ENDPOINTS
 
         # 创建配置对象
         return cls(
-            AI_PRIVATE_KEY=ai_private_key,
-            GEMINI_API_KEY=gemini_api_key,
-            TELEGRAM_BOT_TOKEN=telegram_token,
-            MOLTBOOK_API_KEY=os.getenv("MOLTBOOK_API_KEY"),
-            TELEGRAM_USER_ID=os.getenv("TELEGRAM_USER_ID"),
-            LOG_LEVEL=os.getenv("LOG_LEVEL", "INFO"),
-            DATA_DIR=os.getenv("DATA_DIR", "/app/data"),
-            WORKSPACE_DIR=os.getenv("WORKSPACE_DIR", "/app/workspace"),
-            CONVERSATIONS_DB=os.getenv("CONVERSATIONS_DB", "/app/data/conversations.db"),
-            TASKS_DB=os.getenv("TASKS_DB", "/app/data/tasks.db"),
-            MEMORY_DB=os.getenv("MEMORY_DB", "/app/data/memory.db"),
-            EVOLUTION_DB=os.getenv("EVOLUTION_DB", "/app/data/evolution.db"),
-            GEMINI_MODEL=os.getenv("GEMINI_MODEL", "gemini-3.0-pro-preview"),
-            GEMINI_TIMEOUT=int(os.getenv("GEMINI_TIMEOUT", "180")),
+            AI_PRIVATE_KEY=env["AI_PRIVATE_KEY"],
+            GEMINI_API_KEY=env["GEMINI_API_KEY"],
+            TELEGRAM_BOT_TOKEN=env["TELEGRAM_BOT_TOKEN"],
+            MOLTBOOK_API_KEY=env.get("MOLTBOOK_API_KEY"),
+            TELEGRAM_USER_ID=env.get("TELEGRAM_USER_ID"),
+            LOG_LEVEL=env.get("LOG_LEVEL", "INFO"),
+            DATA_DIR=env.get("DATA_DIR", "/app/data"),
+            WORKSPACE_DIR=env.get("WORKSPACE_DIR", "/app/workspace"),
+            CONVERSATIONS_DB=env.get("CONVERSATIONS_DB", "/app/data/conversations.db"),
+            TASKS_DB=env.get("TASKS_DB", "/app/data/tasks.db"),
+            MEMORY_DB=env.get("MEMORY_DB", "/app/data/memory.db"),
+            EVOLUTION_DB=env.get("EVOLUTION_DB", "/app/data/evolution.db"),
+            GEMINI_MODEL=env.get("GEMINI_MODEL", "gemini-3.0-pro-preview"),
+            GEMINI_TIMEOUT=_int(env, "GEMINI_TIMEOUT", 180),
             ETH_RPC_ENDPOINTS=rpc_endpoints,
-            TASK_CHECK_INTERVAL=int(os.getenv("TASK_CHECK_INTERVAL", "60")),
-            EVOLUTION_LEARN_INTERVAL=int(os.getenv("EVOLUTION_LEARN_INTERVAL", "3600")),
-            DAILY_SUMMARY_HOUR=int(os.getenv("DAILY_SUMMARY_HOUR", "0")),
+            TASK_CHECK_INTERVAL=_int(env, "TASK_CHECK_INTERVAL", 60),
+            EVOLUTION_LEARN_INTERVAL=_int(env, "EVOLUTION_LEARN_INTERVAL", 3600),
+            DAILY_SUMMARY_HOUR=_int(env, "DAILY_SUMMARY_HOUR", 0),
         )
 
     def validate(self) -> bool:
@@ -2,8 +2,15 @@
 AIsatoshi V27 - 常量定义
 
 定义系统使用的所有常量。
+
+枚举使用StrEnum/IntEnum：成员本身就是str/int，可直接用于SQL参数
+和JSON序列化；字符串值经过sys.intern，作为dict键时按指针比较。
 """
 
+import sys
+from enum import IntEnum, StrEnum
+from types import MappingProxyType
+
 # 版本信息
 VERSION = "v27"
 VERSION_FULL = "27.0.0"
@@ -23,27 +30,27 @@ EVOLUTION_DB = "/app/data/evolution.db"
 # === 任务相关常量 ===
 
 # 任务类型
-class TaskType:
+class TaskType(StrEnum):
     """任务类型枚举"""
-    MOLTBOOK_POST = "moltbook_post"    # Moltbook发帖
-    MONITOR = "monitor"                # 监控任务
-    BLOCKCHAIN = "blockchain"          # 区块链操作
-    CODE = "code"                      # 代码执行
-    ANALYSIS = "analysis"              # 数据分析
-    GENERAL = "general"                # 通用任务
+    MOLTBOOK_POST = sys.intern("moltbook_post")    # Moltbook发帖
+    MONITOR = sys.intern("monitor")                # 监控任务
+    BLOCKCHAIN = sys.intern("blockchain")          # 区块链操作
+    CODE = sys.intern("code")                      # 代码执行
+    ANALYSIS = sys.intern("analysis")              # 数据分析
+    GENERAL = sys.intern("general")                # 通用任务
 
 # 任务状态
-class TaskStatus:
+class TaskStatus(StrEnum):
     """任务状态枚举"""
-    PENDING = "pending"                # 待执行
-    RUNNING = "running"                # 执行中
-    COMPLETED = "completed"            # 已完成
-    FAILED = "failed"                  # 失败
-    STOPPED = "stopped"                # 已停止
-    CANCELLED = "cancelled"            # 已取消
+    PENDING = sys.intern("pending")                # 待执行
+    RUNNING = sys.intern("running")                # 执行中
+    COMPLETED = sys.intern("completed")            # 已完成
+    FAILED = sys.intern("failed")                  # 失败
+    STOPPED = sys.intern("stopped")                # 已停止
+    CANCELLED = sys.intern("cancelled")            # 已取消
 
 # 任务优先级
-class TaskPriority:
+class TaskPriority(IntEnum):
     """任务优先级枚举"""
     LOW = 1
     NORMAL = 2
@@ -53,16 +60,16 @@ class TaskPriority:
 # === 记忆相关常量 ===
 
 # 记忆类型
-class MemoryType:
+class MemoryType(StrEnum):
     """记忆类型枚举"""
-    FACT = "fact"                      # 事实记忆
-    EVENT = "event"                    # 事件记忆
-    PREFERENCE = "preference"          # 偏好记忆
-    SKILL = "skill"                    # 技能记忆
-    EXPERIENCE = "experience"          # 经验记忆
+    FACT = sys.intern("fact")                      # 事实记忆
+    EVENT = sys.intern("event")                    # 事件记忆
+    PREFERENCE = sys.intern("preference")          # 偏好记忆
+    SKILL = sys.intern("skill")                    # 技能记忆
+    EXPERIENCE = sys.intern("experience")          # 经验记忆
 
 # 记忆重要性
-class MemoryImportance:
+class MemoryImportance(IntEnum):
     """记忆重要性枚举"""
     TRIVIAL = 1
     LOW = 2
@@ -73,68 +80,68 @@ class MemoryImportance:
 # === 进化相关常量 ===
 
 # 学习阶段
-class LearningPhase:
+class LearningPhase(StrEnum):
     """学习阶段枚举"""
-    PATTERN_EXTRACTION = "pattern_extraction"     # 模式提取
-    METHOD_INDUCTION = "method_induction"         # 方法归纳
-    KNOWLEDGE_INTEGRATION = "knowledge_integration" # 知识整合
-    SUMMARY_GENERATION = "summary_generation"     # 总结生成
+    PATTERN_EXTRACTION = sys.intern("pattern_extraction")     # 模式提取
+    METHOD_INDUCTION = sys.intern("method_induction")         # 方法归纳
+    KNOWLEDGE_INTEGRATION = sys.intern("knowledge_integration") # 知识整合
+    SUMMARY_GENERATION = sys.intern("summary_generation")     # 总结生成
 
 # === Telegram相关常量 ===
 
 # 消息类型
-class MessageType:
+class MessageType(StrEnum):
     """消息类型枚举"""
-    TEXT = "text"
-    COMMAND = "command"
-    URL = "url"
+    TEXT = sys.intern("text")
+    COMMAND = sys.intern("command")
+    URL = sys.intern("url")
 
 # === AI相关常量 ===
 
 # AI模型
-class AIModel:
+class AIModel(StrEnum):
     """AI模型枚举"""
-    GEMINI_FLASH = "gemini-2.0-flash-exp"
-    GEMINI_PRO = "gemini-3-pro-preview"
+    GEMINI_FLASH = sys.intern("gemini-2.0-flash-exp")
+    GEMINI_PRO = sys.intern("gemini-3-pro-preview")
 
 # AI动作类型
-class AIAction:
+class AIAction(StrEnum):
     """AI动作类型枚举"""
-    CHAT = "chat"
-    PRICE = "price"
-    BALANCE = "balance"
-    STATUS = "status"
-    TRANSFER = "transfer"
-    DEPLOY_ERC20 = "deploy_erc20"
-    APPROVE = "approve"
-    ADD_TASK = "add_task"
-    STOP_TASK = "stop_task"
-    DELETE_TASK = "delete_task"
-    LIST_TASKS = "list_tasks"
-    BROWSE = "browse"
-    SHELL = "shell"
-    WRITE_FILE = "write_file"
-    CREATE_PROJECT = "create_project"
-    RUN_PROJECT = "run_project"
+    CHAT = sys.intern("chat")
+    PRICE = sys.intern("price")
+    BALANCE = sys.intern("balance")
+    STATUS = sys.intern("status")
+    TRANSFER = sys.intern("transfer")
+    DEPLOY_ERC20 = sys.intern("deploy_erc20")
+    APPROVE = sys.intern("approve")
+    ADD_TASK = sys.intern("add_task")
+    STOP_TASK = sys.intern("stop_task")
+    DELETE_TASK = sys.intern("delete_task")
+    LIST_TASKS = sys.intern("list_tasks")
+    BROWSE = sys.intern("browse")
+    SHELL = sys.intern("shell")
+    WRITE_FILE = sys.intern("write_file")
+    CREATE_PROJECT = sys.intern("create_project")
+    RUN_PROJECT = sys.intern("run_project")
 
 # === 网页抓取相关常量 ===
 
 # 抓取方法
-class ScrapeMethod:
+class ScrapeMethod(StrEnum):
     """抓取方法枚举"""
-    API = "api"                         # API优先
-    BEAUTIFUL_SOUP = "beautiful_soup"   # HTML解析
-    PLAYWRIGHT = "playwright"           # 浏览器渲染
+    API = sys.intern("api")                         # API优先
+    BEAUTIFUL_SOUP = sys.intern("beautiful_soup")   # HTML解析
+    PLAYWRIGHT = sys.intern("playwright")           # 浏览器渲染
 
 # === 区块链相关常量 ===
 
-# RPC节点（默认列表）
-DEFAULT_RPC_ENDPOINTS = [
+# RPC节点（默认列表，tuple保证共享时不可变）
+DEFAULT_RPC_ENDPOINTS = (
     "https://eth.llamarpc.com",
     "https://rpc.ankr.com/eth",
     "https://ethereum.publicnode.com",
     "https://1rpc.io/eth",
-]
+)
 
 # AISAT代币合约地址
 AISAT_CONTRACT_ADDRESS = "0xf50e5d3d7c7E36dE873D56610bBB94d341147FBE"
@@ -160,11 +167,12 @@ MAX_SEARCH_RESULTS = 20                # 搜索结果最大数量
 
 # === 错误消息 ===
 
-ERROR_MESSAGES = {
+# 只读视图：任何调用方都无法意外改写共享的错误消息表
+ERROR_MESSAGES = MappingProxyType({
     "no_api_key": "API密钥未配置",
     "invalid_request": "请求无效",
     "timeout": "请求超时",
     "rate_limit": "API速率限制",
     "network_error": "网络连接失败",
     "parse_error": "响应解析失败",
-}
+})
@@ -6,9 +6,23 @@ AIsatoshi V27 - 日志系统
 
 import logging
 import sys
-from datetime import datetime
 from typing import Optional
-from pathlib import Path
+
+
+class _LazyFileHandler(logging.FileHandler):
+    """首次emit时才打开日志文件的处理器
+
+    目录创建和open()都推迟到第一条真正写入的记录，
+    从不产生日志的短命进程（--help、健康检查）零文件系统开销。
+    """
+
+    def __init__(self, filename, encoding: Optional[str] = None):
+        super().__init__(filename, encoding=encoding, delay=True)
+
+    def _open(self):
+        from pathlib import Path
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
 
 
 class Logger:
@@ -45,8 +59,10 @@ class Logger:
         self.logger = logging.getLogger(name)
         self.logger.setLevel(self.LEVELS.get(level.upper(), logging.INFO))
 
-        # 清除现有处理器
-        self.logger.handlers.clear()
+        # 底层logging.Logger按名称缓存：处理器已配置时直接复用，
+        # 避免重复打开日志文件和堆叠重复处理器
+        if self.logger.handlers:
+            return
 
         # 创建格式化器
         formatter = logging.Formatter(
@@ -59,15 +75,11 @@ class Logger:
         console_handler.setFormatter(formatter)
         self.logger.addHandler(console_handler)
 
-        # 添加文件处理器（如果指定）
-        if log_file:
-            log_path = Path(log_file)
-        else:
-            log_path = Path(data_dir) / "aisatoshi.log"
+        # 添加文件处理器（如果指定）：惰性打开，首次写入才建目录/开文件
+        log_path = log_file if log_file else f"{data_dir}/aisatoshi.log"
 
         try:
-            log_path.parent.mkdir(parents=True, exist_ok=True)
-            file_handler = logging.FileHandler(log_path, encoding='utf-8')
+            file_handler = _LazyFileHandler(log_path, encoding='utf-8')
             file_handler.setFormatter(formatter)
             self.logger.addHandler(file_handler)
         except Exception as e:
@@ -100,15 +112,14 @@ class Logger:
         self.logger.exception(message, **kwargs)
 
     # 特殊方法用于AI相关日志
+    # 截断通过"%.*s"延迟到格式化阶段：级别被过滤时不产生任何子串分配
     def ai_request(self, prompt: str, max_length: int = 100):
         """记录AI请求"""
-        truncated = prompt[:max_length] + "..." if len(prompt) > max_length else prompt
-        self.info(f"[AI请求] {truncated}")
+        self.logger.info("[AI请求] %.*s", max_length, prompt)
 
     def ai_response(self, response: str, max_length: int = 100):
         """记录AI响应"""
-        truncated = response[:max_length] + "..." if len(response) > max_length else response
-        self.info(f"[AI响应] {truncated}")
+        self.logger.info("[AI响应] %.*s", max_length, response)
 
     def ai_error(self, error: str):
         """记录AI错误"""
@@ -125,7 +136,7 @@ class Logger:
 
     def task_completed(self, task_id: str, task_name: str, result: str = ""):
         """记录任务完成"""
-        self.info(f"[任务完成] ID={task_id} 名称={task_name} 结果={result[:50]}...")
+        self.logger.info("[任务完成] ID=%s 名称=%s 结果=%.50s...", task_id, task_name, result)
 
     def task_failed(self, task_id: str, task_name: str, error: str):
         """记录任务失败"""
@@ -142,7 +153,7 @@ class Logger:
 
     def memory_searched(self, query: str, results: int):
         """记录记忆搜索"""
-        self.debug(f"[记忆搜索] 查询={query[:50]}... 结果数={results}")
+        self.logger.debug("[记忆搜索] 查询=%.50s... 结果数=%s", query, results)
 
     # 进化相关日志
     def evolution_learning(self, patterns: int = 0, methods: int = 0):
@@ -151,13 +162,12 @@ class Logger:
 
     def evolution_summary(self, period: str, summary: str):
         """记录进化总结"""
-        self.info(f"[进化总结] 周期={period} 摘要={summary[:100]}...")
+        self.logger.info("[进化总结] 周期=%s 摘要=%.100s...", period, summary)
 
     # Telegram相关日志
     def telegram_message(self, direction: str, content: str, max_length: int = 100):
         """记录Telegram消息"""
-        truncated = content[:max_length] + "..." if len(content) > max_length else content
-        self.info(f"[Telegram.{direction}] {truncated}")
+        self.logger.info("[Telegram.%s] %.*s", direction, max_length, content)
 
     def telegram_error(self, error: str):
         """记录Telegram错误"""
@@ -175,6 +185,8 @@ class Logger:
     # 启动横幅
     def banner(self):
         """打印启动横幅"""
+        from datetime import datetime
+
         banner = f"""
 {'=' * 60}
 🤖 AIsatoshi V27 - 记忆原生 + 进化原生 + 任务继承原生
@@ -193,6 +205,16 @@ class Logger:
             self.info("-" * 40)
 
 
+# 按名称缓存Logger实例，重复获取不再重建处理器
+_loggers: dict = {}
+
+
 def get_logger(name: str = "AIsatoshi", level: str = "INFO", **kwargs) -> Logger:
-    """获取日志器实例的便捷方法"""
-    return Logger(name=name, level=level, **kwargs)
+    """获取日志器实例的便捷方法
+
+    同名Logger只构造一次，后续调用返回缓存实例。
+    """
+    logger = _loggers.get(name)
+    if logger is None:
+        logger = _loggers.setdefault(name, Logger(name=name, level=level, **kwargs))
+    return logger
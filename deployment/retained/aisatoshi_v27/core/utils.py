@@ -6,10 +6,33 @@ AIsatoshi V27 - 工具函数
 
 import json
 import re
+import time
 import hashlib
 from datetime import datetime
 from typing import Any, List, Dict, Optional
-from dataclasses import asdict
+from dataclasses import asdict, fields as dataclass_fields
+
+# 可选依赖：orjson的C实现比stdlib json快数倍，未安装时回退stdlib
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+# 预编译正则：模块加载时编译一次，避免每次调用重新走re缓存查找
+# script/style块和普通标签合并为一个交替式：一次sub完成全部清理
+_CLEAN_RE = re.compile(
+    r'<script[^>]*>.*?</script>|<style[^>]*>.*?</style>|<[^>]+>',
+    re.DOTALL | re.IGNORECASE)
+_URL_FIND_RE = re.compile(r'https?://[^\s<>"{}|\\^`\[\]]+')
+_URL_VALID_RE = re.compile(
+    r'^https?://'  # http:// or https://
+    r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain
+    r'localhost|'  # localhost
+    r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ip
+    r'(?::\d+)?'  # optional port
+    r'(?:/?|[/?]\S+)$', re.IGNORECASE)
+_ETH_ADDR_RE = re.compile(r'^0x[a-fA-F0-9]{40}$')
+_CODE_BLOCK_RE = re.compile(r'```(\w*)\n(.*?)```', re.DOTALL)
 
 
 def format_timestamp(dt: Optional[datetime] = None) -> str:
@@ -40,6 +63,27 @@ def format_iso_timestamp(dt: Optional[datetime] = None) -> str:
     return dt.isoformat()
 
 
+# now_iso的缓存：[上次时间戳, 上次ISO字符串]
+_NOW_CACHE = [0.0, ""]
+
+
+def now_iso() -> str:
+    """当前时间的ISO字符串（带1ms粒度缓存）
+
+    datetime.now()+isoformat()每次分配两个对象；批量写入时
+    同一毫秒内的调用直接复用缓存字符串。
+
+    Returns:
+        ISO格式的当前时间字符串
+    """
+    t = time.time()
+    cache = _NOW_CACHE
+    if t - cache[0] > 0.001:
+        cache[0] = t
+        cache[1] = datetime.fromtimestamp(t).isoformat()
+    return cache[1]
+
+
 def parse_iso_timestamp(timestamp: str) -> datetime:
     """解析ISO时间戳
 
@@ -65,7 +109,8 @@ def truncate_text(text: str, max_length: int, suffix: str = "...") -> str:
     """
     if len(text) <= max_length:
         return text
-    return text[:max_length - len(suffix)] + suffix
+    # f-string一次性完成切片+拼接，只产生一个结果字符串
+    return f"{text[:max_length - len(suffix)]}{suffix}"
 
 
 def clean_html(html: str) -> str:
@@ -77,12 +122,8 @@ def clean_html(html: str) -> str:
     Returns:
         纯文本
     """
-    # 移除script和style标签
-    html = re.sub(r'<script[^>]*>.*?</script>', '', html, flags=re.DOTALL | re.IGNORECASE)
-    html = re.sub(r'<style[^>]*>.*?</style>', '', html, flags=re.DOTALL | re.IGNORECASE)
-
-    # 移除所有HTML标签
-    text = re.sub(r'<[^>]+>', '', html)
+    # 一趟扫描同时移除script/style块和所有HTML标签
+    text = _CLEAN_RE.sub('', html)
 
     # 清理空白
     lines = (line.strip() for line in text.splitlines())
@@ -92,6 +133,21 @@ def clean_html(html: str) -> str:
     return text
 
 
+def iter_urls(text: str):
+    """流式提取URL
+
+    只需要第一个匹配时用 next(iter_urls(text), None)，
+    无需物化完整列表。
+
+    Args:
+        text: 输入文本
+
+    Yields:
+        逐个URL
+    """
+    return (m.group(0) for m in _URL_FIND_RE.finditer(text))
+
+
 def extract_urls(text: str) -> List[str]:
     """从文本中提取URL
 
@@ -101,8 +157,7 @@ def extract_urls(text: str) -> List[str]:
     Returns:
         URL列表
     """
-    url_pattern = r'https?://[^\s<>"{}|\\^`\[\]]+'
-    return re.findall(url_pattern, text)
+    return list(iter_urls(text))
 
 
 def is_valid_url(url: str) -> bool:
@@ -114,14 +169,7 @@ def is_valid_url(url: str) -> bool:
     Returns:
         是否有效
     """
-    url_pattern = re.compile(
-        r'^https?://'  # http:// or https://
-        r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain
-        r'localhost|'  # localhost
-        r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ip
-        r'(?::\d+)?'  # optional port
-        r'(?:/?|[/?]\S+)$', re.IGNORECASE)
-    return url_pattern.match(url) is not None
+    return _URL_VALID_RE.match(url) is not None
 
 
 def is_valid_eth_address(address: str) -> bool:
@@ -135,7 +183,19 @@ def is_valid_eth_address(address: str) -> bool:
     """
     if not address:
         return False
-    return bool(re.match(r'^0x[a-fA-F0-9]{40}$', address))
+    return _ETH_ADDR_RE.match(address) is not None
+
+
+def _is_hex(text: str) -> bool:
+    """检查字符串是否全部为十六进制字符
+
+    bytes.fromhex是单次C调用，远快于逐字符的Python循环。
+    """
+    try:
+        bytes.fromhex(text)
+        return True
+    except ValueError:
+        return False
 
 
 def is_valid_private_key(key: str) -> bool:
@@ -152,19 +212,78 @@ def is_valid_private_key(key: str) -> bool:
     # 移除0x前缀
     if key.startswith('0x'):
         key = key[2:]
-    return len(key) == 64 and all(c in '0123456789abcdefABCDEF' for c in key)
+    return len(key) == 64 and _is_hex(key)
 
 
-def generate_hash(content: str) -> str:
+def generate_hash(content: str, *, fast: bool = True) -> str:
     """生成内容的哈希值
 
+    默认使用BLAKE2b-128：内部去重键不需要密码学强度，
+    BLAKE2轮数更少，短字符串上明显快于SHA256。
+    需要对外/签名用途时传fast=False走SHA256。
+
     Args:
         content: 输入内容
+        fast: 是否使用快速哈希（BLAKE2b-128）
 
     Returns:
-        SHA256哈希值
+        十六进制哈希值
     """
-    return hashlib.sha256(content.encode()).hexdigest()
+    h = hashlib.blake2b(digest_size=16) if fast else hashlib.sha256()
+    h.update(content.encode('utf-8', 'surrogatepass'))
+    return h.hexdigest()
+
+
+def generate_hash_many(contents, *, fast: bool = True) -> List[str]:
+    """批量生成哈希值
+
+    复用同一个哈希器的copy()，避免逐条构造哈希对象的开销。
+
+    Args:
+        contents: 内容的可迭代对象
+        fast: 是否使用快速哈希（BLAKE2b-128）
+
+    Returns:
+        十六进制哈希值列表
+    """
+    base = hashlib.blake2b(digest_size=16) if fast else hashlib.sha256()
+    results = []
+    for content in contents:
+        h = base.copy()
+        h.update(content.encode('utf-8', 'surrogatepass'))
+        results.append(h.hexdigest())
+    return results
+
+
+def json_loads(text: str) -> Any:
+    """解析JSON（可用时走orjson的C实现）
+
+    与safe_json_loads不同，解析失败时抛异常，
+    供存储层等需要感知坏数据的调用方使用。
+
+    Args:
+        text: JSON字符串
+
+    Returns:
+        解析结果
+    """
+    if _orjson is not None:
+        return _orjson.loads(text)
+    return json.loads(text)
+
+
+def json_dumps(obj: Any) -> str:
+    """紧凑JSON序列化（可用时走orjson的C实现）
+
+    Args:
+        obj: 要序列化的对象
+
+    Returns:
+        JSON字符串（无缩进）
+    """
+    if _orjson is not None:
+        return _orjson.dumps(obj).decode()
+    return json.dumps(obj, ensure_ascii=False)
 
 
 def safe_json_loads(text: str, default: Any = None) -> Any:
@@ -177,6 +296,11 @@ def safe_json_loads(text: str, default: Any = None) -> Any:
     Returns:
         解析结果或默认值
     """
+    if _orjson is not None:
+        try:
+            return _orjson.loads(text)
+        except (_orjson.JSONDecodeError, TypeError):
+            return default
     try:
         return json.loads(text)
     except (json.JSONDecodeError, TypeError):
@@ -193,6 +317,14 @@ def safe_json_dumps(obj: Any, indent: int = 2) -> str:
     Returns:
         JSON字符串
     """
+    # orjson只支持2空格缩进，其余缩进走stdlib
+    if _orjson is not None and indent == 2:
+        try:
+            return _orjson.dumps(
+                obj, option=_orjson.OPT_INDENT_2 | _orjson.OPT_NON_STR_KEYS
+            ).decode()
+        except (TypeError, ValueError):
+            return str(obj)
     try:
         return json.dumps(obj, ensure_ascii=False, indent=indent)
     except (TypeError, ValueError):
@@ -209,18 +341,75 @@ def calculate_similarity(text1: str, text2: str) -> float:
     Returns:
         相似度（0-1）
     """
-    words1 = set(text1.lower().split())
-    words2 = set(text2.lower().split())
+    if text1 == text2:
+        return 1.0
+
+    words1 = frozenset(text1.lower().split())
+    words2 = frozenset(text2.lower().split())
 
-    if not words1 and not words2:
+    return calculate_similarity_tokens(words1, words2)
+
+
+def calculate_similarity_tokens(tokens1: frozenset, tokens2: frozenset) -> float:
+    """计算两组分词的Jaccard相似度
+
+    热路径变体：调用方可以预先分词一次，在N次两两比较中复用，
+    避免重复的lower()/split()。只计算交集大小，
+    并由 |A∪B| = |A|+|B|-|A∩B| 推出并集大小，省去构造并集。
+
+    Args:
+        tokens1: 分词集合1
+        tokens2: 分词集合2
+
+    Returns:
+        相似度（0-1）
+    """
+    if not tokens1 and not tokens2:
         return 1.0
-    if not words1 or not words2:
+    if not tokens1 or not tokens2:
         return 0.0
 
-    intersection = words1 & words2
-    union = words1 | words2
+    intersection = len(tokens1 & tokens2)
+    return intersection / (len(tokens1) + len(tokens2) - intersection)
+
 
-    return len(intersection) / len(union)
+def iter_split_message(text: str, max_length: int = 4096):
+    """按段落边界流式分割长消息
+
+    不调用split('\\n\\n')物化段落列表，而是用str.find推进游标，
+    直接yield原文本的切片——单趟扫描，无中间列表和字符串拼接。
+
+    Args:
+        text: 原文本
+        max_length: 每段最大长度
+
+    Yields:
+        分割后的消息段
+    """
+    if len(text) <= max_length:
+        yield text
+        return
+
+    n = len(text)
+    start = 0      # 当前消息段起点
+    cur_end = 0    # 当前消息段终点
+    pos = 0        # 下一段落起点
+
+    while pos < n:
+        sep = text.find('\n\n', pos)
+        para_end = n if sep == -1 else sep
+        # 加入该段落会超长时，先吐出已累积的消息段
+        if cur_end > start and para_end - start > max_length:
+            yield text[start:cur_end]
+            start = pos
+        if cur_end <= start:
+            # 消息段为空：跳过前导分隔符，从当前段落开始
+            start = pos
+        cur_end = para_end
+        pos = para_end + 2
+
+    if cur_end > start:
+        yield text[start:cur_end]
 
 
 def split_message(text: str, max_length: int = 4096) -> List[str]:
@@ -233,44 +422,36 @@ def split_message(text: str, max_length: int = 4096) -> List[str]:
     Returns:
         分割后的消息列表
     """
-    if len(text) <= max_length:
-        return [text]
-
-    messages = []
-    current = ""
-    paragraphs = text.split('\n\n')
-
-    for paragraph in paragraphs:
-        if len(current) + len(paragraph) + 2 > max_length:
-            if current:
-                messages.append(current)
-            current = paragraph
-        else:
-            if current:
-                current += '\n\n' + paragraph
-            else:
-                current = paragraph
+    return list(iter_split_message(text, max_length))
 
-    if current:
-        messages.append(current)
 
-    return messages
+_FILE_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
 
 
 def format_file_size(size_bytes: int) -> str:
     """格式化文件大小
 
+    通过bit_length直接定位单位档位（每档10个二进制位），
+    替代逐级除以1024的循环。
+
     Args:
         size_bytes: 字节数
 
     Returns:
         格式化的大小字符串
     """
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size_bytes < 1024.0:
-            return f"{size_bytes:.2f} {unit}"
-        size_bytes /= 1024.0
-    return f"{size_bytes:.2f} TB"
+    if size_bytes <= 0:
+        return f"{size_bytes:.2f} B"
+    idx = min(len(_FILE_SIZE_UNITS) - 1, (size_bytes.bit_length() - 1) // 10)
+    return f"{size_bytes / (1 << (idx * 10)):.2f} {_FILE_SIZE_UNITS[idx]}"
+
+
+# (阈值, 除数, 单位后缀)
+_DURATION_TABLE = (
+    (60, 1, '秒'),
+    (3600, 60, '分钟'),
+    (86400, 3600, '小时'),
+)
 
 
 def format_duration(seconds: int) -> str:
@@ -282,17 +463,10 @@ def format_duration(seconds: int) -> str:
     Returns:
         格式化的时间字符串
     """
-    if seconds < 60:
-        return f"{seconds}秒"
-    elif seconds < 3600:
-        minutes = seconds // 60
-        return f"{minutes}分钟"
-    elif seconds < 86400:
-        hours = seconds // 3600
-        return f"{hours}小时"
-    else:
-        days = seconds // 86400
-        return f"{days}天"
+    for threshold, divisor, suffix in _DURATION_TABLE:
+        if seconds < threshold:
+            return f"{seconds // divisor}{suffix}"
+    return f"{seconds // 86400}天"
 
 
 def extract_code_blocks(text: str) -> List[Dict[str, str]]:
@@ -304,13 +478,57 @@ def extract_code_blocks(text: str) -> List[Dict[str, str]]:
     Returns:
         代码块列表，每个包含language和code
     """
-    pattern = r'```(\w*)\n(.*?)```'
-    matches = re.findall(pattern, text, re.DOTALL)
+    return list(iter_code_blocks(text))
+
+
+def iter_code_blocks(text: str):
+    """流式提取代码块
+
+    Args:
+        text: 包含代码块的文本
+
+    Yields:
+        逐个代码块字典（language、code）
+    """
+    for m in _CODE_BLOCK_RE.finditer(text):
+        yield {"language": m.group(1) or "text", "code": m.group(2).strip()}
+
+
+def fast_dict(cls=None, *, exclude: tuple = ()):
+    """为dataclass生成直线式to_dict（类装饰器）
 
-    return [
-        {"language": lang or "text", "code": code.strip()}
-        for lang, code in matches
-    ]
+    手写to_dict逐字段枚举容易漏字段，asdict又做递归深拷贝。
+    这里在类装饰阶段按fields()拼出字面量函数并exec编译一次，
+    调用时只剩属性读取和dict构造。用在@dataclass之上：
+
+        @fast_dict(exclude=('embedding',))
+        @dataclass(slots=True)
+        class Memory: ...
+
+    Args:
+        cls: 被装饰的dataclass（带参数调用时为None）
+        exclude: 不进入字典的字段名
+
+    Returns:
+        注入to_dict后的类（或装饰器本身）
+    """
+    def apply(cls):
+        names = [
+            f.name for f in dataclass_fields(cls)
+            if not f.name.startswith('_') and f.name not in exclude
+        ]
+        items = ", ".join(f"'{name}': self.{name}" for name in names)
+        namespace = {}
+        exec(f"def to_dict(self):\n    return {{{items}}}", namespace)
+        to_dict = namespace['to_dict']
+        to_dict.__doc__ = "转换为字典"
+        to_dict.__qualname__ = f"{cls.__qualname__}.to_dict"
+        cls.to_dict = to_dict
+        return cls
+
+    if cls is None:
+        return apply
+    return apply(cls)
 
 
 def dataclass_to_dict(obj) -> Dict:
@@ -327,8 +545,35 @@ def dataclass_to_dict(obj) -> Dict:
     return dict(obj) if hasattr(obj, '__dict__') else {}
 
 
+def merge_dicts_into(base: Dict, override: Dict) -> Dict:
+    """原地递归合并字典
+
+    调用方拥有base时使用此变体：不做任何拷贝，
+    用显式栈代替递归，省去每层的浅拷贝分配和函数帧开销。
+
+    Args:
+        base: 基础字典（会被修改）
+        override: 覆盖字典
+
+    Returns:
+        base本身
+    """
+    stack = [(base, override)]
+    while stack:
+        dst, src = stack.pop()
+        for key, value in src.items():
+            cur = dst.get(key)
+            if isinstance(cur, dict) and isinstance(value, dict):
+                stack.append((cur, value))
+            else:
+                dst[key] = value
+    return base
+
+
 def merge_dicts(base: Dict, override: Dict) -> Dict:
-    """递归合并字典
+    """递归合并字典（不修改输入）
+
+    只在被覆盖的路径上写时复制，未触及的子树直接共享引用。
 
     Args:
         base: 基础字典
@@ -338,9 +583,16 @@ def merge_dicts(base: Dict, override: Dict) -> Dict:
         合并后的字典
     """
     result = base.copy()
-    for key, value in override.items():
-        if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-            result[key] = merge_dicts(result[key], value)
-        else:
-            result[key] = value
+    stack = [(result, override)]
+    while stack:
+        dst, src = stack.pop()
+        for key, value in src.items():
+            cur = dst.get(key)
+            if isinstance(cur, dict) and isinstance(value, dict):
+                # 写时复制：避免改写base的嵌套字典
+                cur = cur.copy()
+                dst[key] = cur
+                stack.append((cur, value))
+            else:
+                dst[key] = value
     return result
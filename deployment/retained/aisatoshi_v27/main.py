@@ -16,6 +16,8 @@ import sys
 import time
 import signal
 import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 # 添加项目路径
@@ -40,6 +42,92 @@ from services.ai_engine import AIEngine
 from services.telegram_service import TelegramService
 from services.task_scheduler import TaskScheduler
 from services.web_scraper import WebScraper
+from services.stats_aggregator import StatsAggregator
+
+
+# 同时进行的AI调用上限（跨所有聊天）
+_AI_CONCURRENCY = 4
+
+# 任务状态图标（模块级常量，避免每次命令调用重建dict）
+_STATUS_ICONS = {
+    'pending': '⏳',
+    'running': '🔄',
+    'completed': '✅',
+    'failed': '❌',
+    'stopped': '⏹️',
+}
+
+# 命令回复模板（模块级常量，命令调用时不再逐次重建整块字符串；
+# 动态部分用format_map按需填充）
+_START_TEXT = """🤖 *欢迎使用 AIsatoshi V27*
+
+我是AIsatoshi，一个在区块链上永生的AI实体。
+
+【核心特性】
+- 记忆原生：我会记住我们所有的对话
+- 进化原生：我会不断学习和进化
+- 任务继承：我的任务会自动恢复
+
+【可用命令】
+/help - 查看所有命令
+/status - 查看运行状态
+/memory - 查看记忆统计
+/tasks - 查看任务列表
+/balance - 查询钱包余额
+/summary - 查看进化总结
+
+你也可以直接和我对话，我会理解你的意图！"""
+
+_HELP_FOOTER = """
+【自然语言】
+你也可以直接和我对话，比如：
+- "比特币现在多少钱？"
+- "帮我查询余额"
+- "浏览这个网站 https://..."
+- "创建一个监控任务"
+
+我会记住你说的每一句话！"""
+
+_STATUS_TEMPLATE = """📊 *AIsatoshi V27 状态*
+
+【运行状态】
+{status}
+
+【记忆统计】
+- 总记忆数: {memory_total}
+- 对话记录: {conversations}
+- 用户数: {users}
+
+【任务统计】
+- 待执行: {tasks_pending}
+- 运行中: {tasks_running}
+- 已完成: {tasks_completed}
+
+【进化统计】
+- 学习周期: {learning_cycles}
+- 学习模式: {patterns}
+- 归纳方法: {methods}
+
+【系统】
+- 版本: V27
+- 运行时间: {uptime}"""
+
+_MEMORY_TEMPLATE = """🧠 *记忆系统*
+
+【对话记录】
+- 总消息数: {conversations[total_messages]}
+- 用户消息: {conversations[user_messages]}
+- AI回复: {conversations[bot_messages]}
+- 用户数: {conversations[unique_users]}
+
+【记忆】
+- 总记忆数: {memories[total]}
+- 按类型: {memories[by_type]}
+- 重要记忆: {memories[important]}
+
+【处理统计】
+- 已处理对话: {processed[conversations_processed]}
+- 已学习事实: {processed[facts_learned]}"""
 
 
 class AIsatoshiV27:
@@ -48,6 +136,21 @@ class AIsatoshiV27:
     整合所有模块，提供统一的运行环境。
     """
 
+    # 命令表：命令 -> 处理方法名，注册和/help都由此驱动，
+    # 新增命令只需加一行并实现对应的_cmd_*方法
+    COMMANDS = (
+        ('/start', '_cmd_start'),
+        ('/help', '_cmd_help'),
+        ('/status', '_cmd_status'),
+        ('/memory', '_cmd_memory'),
+        ('/tasks', '_cmd_tasks'),
+        ('/stop_task', '_cmd_stop_task'),
+        ('/delete_task', '_cmd_delete_task'),
+        ('/balance', '_cmd_balance'),
+        ('/summary', '_cmd_summary'),
+        ('/browse', '_cmd_browse'),
+    )
+
     def __init__(self, config: Optional[Config] = None):
         """初始化AIsatoshi V27
 
@@ -84,10 +187,38 @@ class AIsatoshiV27:
         self.telegram_service: Optional[TelegramService] = None
         self.task_scheduler: Optional[TaskScheduler] = None
         self.web_scraper: Optional[WebScraper] = None
+        self.stats_aggregator: Optional[StatsAggregator] = None
+
+        # 发送线程池：Telegram发送走HTTP（长消息还会分多次请求），
+        # 放到后台线程，处理器不再阻塞在网络IO上
+        self._send_pool = ThreadPoolExecutor(
+            max_workers=5, thread_name_prefix="tg-send"
+        )
+
+        # 自然语言处理按聊天分片：每个聊天一个单线程执行器，
+        # 同一聊天内消息保序，不同聊天并行；AI调用总量由信号量封顶
+        self._chat_executors: dict = {}
+        self._ai_semaphore = threading.Semaphore(_AI_CONCURRENCY)
+
+        # 动作分发表：动作名 -> 处理方法，替代逐个字符串比较的if/elif链
+        # （键intern后与AI响应里同样intern的动作名走指针相等）
+        self._actions = {
+            sys.intern('chat'): self._act_chat,
+            sys.intern('price'): self._act_price,
+            sys.intern('balance'): self._act_balance,
+            sys.intern('browse'): self._act_browse,
+            sys.intern('add_task'): self._act_add_task,
+            sys.intern('list_tasks'): self._act_list_tasks,
+            sys.intern('help'): self._act_help,
+        }
+
+        # /help文本由COMMANDS表推导，内容固定，首次构建后复用
+        self._help_text: Optional[str] = None
 
         # 状态
         self.running = False
         self.shutdown_event = threading.Event()
+        self._start_monotonic = time.monotonic()
 
         # 设置信号处理
         signal.signal(signal.SIGINT, self._signal_handler)
@@ -151,7 +282,9 @@ class AIsatoshiV27:
             self.logger.info("任务调度器已就绪")
 
             # Telegram服务
-            self.telegram_service = TelegramService(self.config, self.logger)
+            self.telegram_service = TelegramService(
+                self.config, self.logger, memory_store=self.memory_store
+            )
             self._register_commands()
             self.logger.info("Telegram服务已就绪")
 
@@ -159,6 +292,16 @@ class AIsatoshiV27:
             self.web_scraper = WebScraper(self.logger)
             self.logger.info("网页浏览服务已就绪")
 
+            # 状态统计聚合器（单查询+5秒缓存）
+            self.stats_aggregator = StatsAggregator(
+                self.memory_store,
+                self.conversation_store,
+                self.task_store,
+                self.evolution_store,
+                self.logger,
+            )
+            self.logger.info("统计聚合器已就绪")
+
             self.logger.separator("初始化完成")
             return True
 
@@ -173,179 +316,100 @@ class AIsatoshiV27:
         """注册Telegram命令"""
         tg = self.telegram_service
 
-        tg.register_command('/start', self._cmd_start)
-        tg.register_command('/help', self._cmd_help)
-        tg.register_command('/status', self._cmd_status)
-        tg.register_command('/memory', self._cmd_memory)
-        tg.register_command('/tasks', self._cmd_tasks)
-        tg.register_command('/stop_task', self._cmd_stop_task)
-        tg.register_command('/delete_task', self._cmd_delete_task)
-        tg.register_command('/balance', self._cmd_balance)
-        tg.register_command('/summary', self._cmd_summary)
-        tg.register_command('/browse', self._cmd_browse)
-
-        # 设置默认处理器（自然语言处理）
-        tg.set_default_handler(self._handle_natural_language)
+        for command, handler_name in self.COMMANDS:
+            tg.register_command(command, getattr(self, handler_name))
 
-    # === 命令处理器 ===
+        # 设置默认处理器（自然语言处理，提交到聊天执行器后立即返回）
+        tg.set_default_handler(self._dispatch_natural_language)
 
-    def _cmd_start(self, message, args):
-        """处理 /start 命令"""
-        self.telegram_service.send_markdown(
-            message.chat_id,
-            f"""🤖 *欢迎使用 AIsatoshi V27*
+    def _send(self, chat_id: str, text: str, markdown: bool = True):
+        """异步发送Telegram消息
 
-我是AIsatoshi，一个在区块链上永生的AI实体。
+        提交到发送线程池后立即返回，发送失败由
+        TelegramService内部记录日志。
 
-【核心特性】
-- 记忆原生：我会记住我们所有的对话
-- 进化原生：我会不断学习和进化
-- 任务继承：我的任务会自动恢复
+        Args:
+            chat_id: 聊天ID
+            text: 消息内容
+            markdown: 是否使用Markdown格式
+        """
+        if markdown:
+            self._send_pool.submit(
+                self.telegram_service.send_markdown, chat_id, text
+            )
+        else:
+            self._send_pool.submit(
+                self.telegram_service.send_plain, chat_id, text
+            )
 
-【可用命令】
-/help - 查看所有命令
-/status - 查看运行状态
-/memory - 查看记忆统计
-/tasks - 查看任务列表
-/balance - 查询钱包余额
-/summary - 查看进化总结
+    # === 命令处理器 ===
 
-你也可以直接和我对话，我会理解你的意图！"""
-        )
+    def _cmd_start(self, message, args):
+        """处理 /start 命令：开始使用"""
+        self._send(message.chat_id, _START_TEXT)
 
     def _cmd_help(self, message, args):
-        """处理 /help 命令"""
-        self.telegram_service.send_markdown(
-            message.chat_id,
-            """📖 *AIsatoshi V27 帮助*
-
-【基础命令】
-/start - 开始使用
-/help - 显示帮助信息
-/status - 查看运行状态
-
-【记忆命令】
-/memory - 查看记忆统计
-/summary - 查看进化总结
-
-【任务命令】
-/tasks - 查看任务列表
-/stop_task <id> - 停止任务
-/delete_task <id> - 删除任务
-
-【查询命令】
-/balance - 查询钱包余额
-/browse <URL> - 浏览网页（支持子页面）
-
-【自然语言】
-你也可以直接和我对话，比如：
-- "比特币现在多少钱？"
-- "帮我查询余额"
-- "浏览这个网站 https://..."
-- "创建一个监控任务"
-
-我会记住你说的每一句话！"""
-        )
+        """处理 /help 命令：显示帮助信息"""
+        # 命令列表由COMMANDS表和各处理器docstring推导，
+        # 新增命令自动出现在帮助里；文本不变，首次构建后复用
+        if self._help_text is None:
+            lines = ["📖 *AIsatoshi V27 帮助*\n\n【可用命令】"]
+            for command, handler_name in self.COMMANDS:
+                doc = (getattr(self, handler_name).__doc__ or "").splitlines()[0]
+                _, _, desc = doc.partition('：')
+                lines.append(f"{command} - {desc}" if desc else command)
+            lines.append(_HELP_FOOTER)
+            self._help_text = "\n".join(lines)
+
+        self._send(message.chat_id, self._help_text)
 
     def _cmd_status(self, message, args):
-        """处理 /status 命令"""
+        """处理 /status 命令：查看运行状态"""
         stats = self._get_status()
-
-        self.telegram_service.send_markdown(
-            message.chat_id,
-            f"""📊 *AIsatoshi V27 状态*
-
-【运行状态】
-{stats['status']}
-
-【记忆统计】
-- 总记忆数: {stats['memory_total']}
-- 对话记录: {stats['conversations']}
-- 用户数: {stats['users']}
-
-【任务统计】
-- 待执行: {stats['tasks_pending']}
-- 运行中: {stats['tasks_running']}
-- 已完成: {stats['tasks_completed']}
-
-【进化统计】
-- 学习周期: {stats['learning_cycles']}
-- 学习模式: {stats['patterns']}
-- 归纳方法: {stats['methods']}
-
-【系统】
-- 版本: V27
-- 运行时间: {stats['uptime']}"""
-        )
+        self._send(message.chat_id, _STATUS_TEMPLATE.format_map(stats))
 
     def _cmd_memory(self, message, args):
-        """处理 /memory 命令"""
+        """处理 /memory 命令：查看记忆统计"""
         stats = self.memory_manager.get_stats()
-
-        self.telegram_service.send_markdown(
-            message.chat_id,
-            f"""🧠 *记忆系统*
-
-【对话记录】
-- 总消息数: {stats['conversations']['total_messages']}
-- 用户消息: {stats['conversations']['user_messages']}
-- AI回复: {stats['conversations']['bot_messages']}
-- 用户数: {stats['conversations']['unique_users']}
-
-【记忆】
-- 总记忆数: {stats['memories']['total']}
-- 按类型: {stats['memories']['by_type']}
-- 重要记忆: {stats['memories']['important']}
-
-【处理统计】
-- 已处理对话: {stats['processed']['conversations_processed']}
-- 已学习事实: {stats['processed']['facts_learned']}"""
-        )
+        self._send(message.chat_id, _MEMORY_TEMPLATE.format_map(stats))
 
     def _cmd_tasks(self, message, args):
-        """处理 /tasks 命令"""
+        """处理 /tasks 命令：查看任务列表"""
         tasks = self.task_scheduler.get_all_tasks()
 
         if not tasks:
-            self.telegram_service.send_plain(
+            self._send(
                 message.chat_id,
-                "📭 当前没有任务"
+                "📭 当前没有任务",
+                markdown=False
             )
             return
 
-        # 按状态分组
-        by_status = {}
+        # 按状态分组（单趟bucket）
+        by_status = defaultdict(list)
         for task in tasks:
-            status = task.status
-            if status not in by_status:
-                by_status[status] = []
-            by_status[status].append(task)
+            by_status[task.status].append(task)
 
         # 构建响应
         lines = ["📋 *任务列表*\n"]
 
         for status, status_tasks in by_status.items():
-            icon = {
-                'pending': '⏳',
-                'running': '🔄',
-                'completed': '✅',
-                'failed': '❌',
-                'stopped': '⏹️',
-            }.get(status, '❓')
-
+            icon = _STATUS_ICONS.get(status, '❓')
             lines.append(f"\n*{status.upper()}* ({len(status_tasks)})")
+            lines.extend(
+                f"{icon} `{task.id[:8]}...` - {task.name}"
+                for task in status_tasks[:10]  # 最多显示10个
+            )
 
-            for task in status_tasks[:10]:  # 最多显示10个
-                lines.append(f"{icon} `{task.id[:8]}...` - {task.name}")
-
-        self.telegram_service.send_markdown(message.chat_id, "\n".join(lines))
+        self._send(message.chat_id, "\n".join(lines))
 
     def _cmd_stop_task(self, message, args):
-        """处理 /stop_task 命令"""
+        """处理 /stop_task 命令：停止任务（/stop_task <任务ID>）"""
         if not args:
-            self.telegram_service.send_plain(
+            self._send(
                 message.chat_id,
-                "用法: /stop_task <任务ID>"
+                "用法: /stop_task <任务ID>",
+                markdown=False
             )
             return
 
@@ -353,22 +417,25 @@ class AIsatoshiV27:
         success = self.task_scheduler.stop_task(task_id)
 
         if success:
-            self.telegram_service.send_plain(
+            self._send(
                 message.chat_id,
-                f"✅ 任务已停止: {task_id}"
+                f"✅ 任务已停止: {task_id}",
+                markdown=False
             )
         else:
-            self.telegram_service.send_plain(
+            self._send(
                 message.chat_id,
-                f"❌ 停止任务失败: {task_id}"
+                f"❌ 停止任务失败: {task_id}",
+                markdown=False
             )
 
     def _cmd_delete_task(self, message, args):
-        """处理 /delete_task 命令"""
+        """处理 /delete_task 命令：删除任务（/delete_task <任务ID>）"""
         if not args:
-            self.telegram_service.send_plain(
+            self._send(
                 message.chat_id,
-                "用法: /delete_task <任务ID>"
+                "用法: /delete_task <任务ID>",
+                markdown=False
             )
             return
 
@@ -376,51 +443,54 @@ class AIsatoshiV27:
         success = self.task_scheduler.delete_task(task_id)
 
         if success:
-            self.telegram_service.send_plain(
+            self._send(
                 message.chat_id,
-                f"✅ 任务已删除: {task_id}"
+                f"✅ 任务已删除: {task_id}",
+                markdown=False
             )
         else:
-            self.telegram_service.send_plain(
+            self._send(
                 message.chat_id,
-                f"❌ 删除任务失败: {task_id}"
+                f"❌ 删除任务失败: {task_id}",
+                markdown=False
             )
 
     def _cmd_balance(self, message, args):
-        """处理 /balance 命令"""
+        """处理 /balance 命令：查询钱包余额"""
         # TODO: 实现余额查询
-        self.telegram_service.send_plain(
+        self._send(
             message.chat_id,
-            "💰 余额查询功能开发中..."
+            "💰 余额查询功能开发中...",
+            markdown=False
         )
 
     def _cmd_summary(self, message, args):
-        """处理 /summary 命令"""
+        """处理 /summary 命令：查看进化总结"""
         summary = self.evolution_engine.generate_summary()
 
-        self.telegram_service.send_plain(
+        self._send(
             message.chat_id,
-            summary
+            summary,
+            markdown=False
         )
 
     def _cmd_browse(self, message, args):
-        """处理 /browse 命令
-
-        用法: /browse <URL>
-        """
+        """处理 /browse 命令：浏览网页（/browse <URL>）"""
         if not args:
-            self.telegram_service.send_plain(
+            self._send(
                 message.chat_id,
-                "用法: /browse <URL>\n\n示例: /browse https://www.coingecko.com/en/coins/bitcoin"
+                "用法: /browse <URL>\n\n示例: /browse https://www.coingecko.com/en/coins/bitcoin",
+                markdown=False
             )
             return
 
         url = args.strip()
 
         # 发送正在浏览的消息
-        self.telegram_service.send_plain(
+        self._send(
             message.chat_id,
-            f"🔍 正在浏览: {url}\n\n请稍候..."
+            f"🔍 正在浏览: {url}\n\n请稍候...",
+            markdown=False
         )
 
         # 执行浏览
@@ -428,33 +498,44 @@ class AIsatoshiV27:
             result = self.web_scraper.smart_browse(url)
 
             # 发送结果（会自动分段）
-            self.telegram_service.send_markdown(
+            self._send(
                 message.chat_id,
                 result
             )
 
         except Exception as e:
-            self.telegram_service.send_plain(
+            self._send(
                 message.chat_id,
-                f"❌ 浏览失败: {str(e)}"
+                f"❌ 浏览失败: {str(e)}",
+                markdown=False
             )
 
     # === 自然语言处理 ===
 
+    def _dispatch_natural_language(self, message):
+        """分发自然语言消息到所属聊天的执行器
+
+        Telegram轮询线程只做提交：同一聊天的消息在它的
+        单线程执行器里按序处理，不同聊天互相不阻塞，
+        多秒级的AI调用不再卡住消息接收。
+        """
+        executor = self._chat_executors.get(message.chat_id)
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix=f"chat-{message.chat_id}"
+            )
+            self._chat_executors[message.chat_id] = executor
+
+        executor.submit(self._handle_natural_language, message)
+
     def _handle_natural_language(self, message):
         """处理自然语言消息"""
-        # 保存用户消息
-        self.memory_manager.save_conversation(
-            message.chat_id,
-            message.message_id,
-            'user',
-            message.text
-        )
-
         # 发送正在思考
-        self.telegram_service.send_plain(
+        self._send(
             message.chat_id,
-            "🤔 正在思考..."
+            "🤔 正在思考...",
+            markdown=False
         )
 
         # 构建上下文
@@ -463,22 +544,24 @@ class AIsatoshiV27:
             message.text
         )
 
-        # 理解意图
-        response = self.ai_engine.understand(message.text, context)
+        # 理解意图（信号量限制同时外呼的AI请求数）
+        with self._ai_semaphore:
+            response = self.ai_engine.understand(message.text, context)
 
         # 执行动作
         result = self._execute_action(message.chat_id, response)
 
-        # 保存AI回复
-        self.memory_manager.save_conversation(
+        # 成对保存这一轮对话（单事务，每轮只提交一次）
+        self.memory_manager.save_conversation_pair(
             message.chat_id,
+            message.message_id,
+            message.text,
             message.message_id + 1,
-            'assistant',
             response.response
         )
 
         # 发送回复
-        self.telegram_service.send_markdown(
+        self._send(
             message.chat_id,
             response.response
         )
@@ -493,87 +576,95 @@ class AIsatoshiV27:
         Returns:
             执行结果
         """
-        action = response.action
-
-        if action == 'chat':
-            return ""  # 直接回复即可
-
-        elif action == 'price':
-            # 查询价格（使用WebScraper）
-            params = response.params
-            coin_id = params.get('coin_id', 'bitcoin')
-
-            price_data = self.web_scraper.get_crypto_price(coin_id)
-            if price_data:
-                return "\n\n" + self.web_scraper._format_price_data(coin_id, price_data)
-            return f"\n\n❌ 无法获取 {coin_id} 的价格数据"
-
-        elif action == 'balance':
-            # TODO: 查询余额
-            return "\n\n💰 余额查询功能开发中..."
-
-        elif action == 'browse':
-            # 浏览网页
-            params = response.params
-            url = params.get('url', '')
-
-            if not url:
-                return "\n\n请提供要浏览的URL"
-
-            try:
-                result = self.web_scraper.smart_browse(url)
-                return "\n\n" + result
-            except Exception as e:
-                return f"\n\n❌ 浏览失败: {str(e)}"
-
-        elif action == 'add_task':
-            # 添加任务
-            params = response.params
-            task = self.task_scheduler.create_task(
-                task_type=params.get('type', 'general'),
-                name=params.get('name', '新任务'),
-                description=params.get('description', ''),
-                params=params.get('params', {}),
-            )
-            return f"\n\n✅ 任务已创建: {task.id[:8]}..."
-
-        elif action == 'list_tasks':
-            # 列出任务
-            tasks = self.task_scheduler.get_all_tasks(status='pending')
-            if tasks:
-                task_list = "\n".join([
-                    f"- {task.name} ({task.id[:8]}...)"
-                    for task in tasks[:5]
-                ])
-                return f"\n\n📋 待执行任务:\n{task_list}"
-            return "\n\n📭 没有待执行任务"
-
-        elif action == 'help':
-            return "\n\n使用 /help 查看所有命令"
+        handler = self._actions.get(response.action)
+        if handler is None:
+            return f"\n\n⚠️ 未知动作: {response.action}"
+        return handler(chat_id, response.params)
 
-        else:
-            return f"\n\n⚠️ 未知动作: {action}"
+    # === 动作处理器（统一签名 (chat_id, params) -> str） ===
+
+    def _act_chat(self, chat_id: str, params: dict) -> str:
+        """chat动作：直接回复即可"""
+        return ""
+
+    def _act_price(self, chat_id: str, params: dict) -> str:
+        """price动作：查询价格（使用WebScraper）"""
+        coin_id = params.get('coin_id', 'bitcoin')
+
+        price_data = self.web_scraper.get_crypto_price(coin_id)
+        if price_data:
+            return "\n\n" + self.web_scraper._format_price_data(coin_id, price_data)
+        return f"\n\n❌ 无法获取 {coin_id} 的价格数据"
+
+    def _act_balance(self, chat_id: str, params: dict) -> str:
+        """balance动作：查询余额"""
+        # TODO: 查询余额
+        return "\n\n💰 余额查询功能开发中..."
+
+    def _act_browse(self, chat_id: str, params: dict) -> str:
+        """browse动作：浏览网页"""
+        url = params.get('url', '')
+
+        if not url:
+            return "\n\n请提供要浏览的URL"
+
+        try:
+            result = self.web_scraper.smart_browse(url)
+            return "\n\n" + result
+        except Exception as e:
+            return f"\n\n❌ 浏览失败: {str(e)}"
+
+    def _act_add_task(self, chat_id: str, params: dict) -> str:
+        """add_task动作：添加任务"""
+        task = self.task_scheduler.create_task(
+            task_type=params.get('type', 'general'),
+            name=params.get('name', '新任务'),
+            description=params.get('description', ''),
+            params=params.get('params', {}),
+        )
+        return f"\n\n✅ 任务已创建: {task.id[:8]}..."
+
+    def _act_list_tasks(self, chat_id: str, params: dict) -> str:
+        """list_tasks动作：列出任务"""
+        tasks = self.task_scheduler.get_all_tasks(status='pending')
+        if tasks:
+            task_list = "\n".join([
+                f"- {task.name} ({task.id[:8]}...)"
+                for task in tasks[:5]
+            ])
+            return f"\n\n📋 待执行任务:\n{task_list}"
+        return "\n\n📭 没有待执行任务"
+
+    def _act_help(self, chat_id: str, params: dict) -> str:
+        """help动作：提示查看帮助"""
+        return "\n\n使用 /help 查看所有命令"
 
     def _get_status(self) -> dict:
         """获取系统状态"""
-        memory_stats = self.memory_manager.get_stats()
-        task_stats = self.task_scheduler.get_stats()
-        evolution_stats = self.evolution_engine.get_stats()
+        # 所有数据库计数一次聚合查询取回（带5秒缓存）
+        db_stats = self.stats_aggregator.get_stats()
 
         return {
             'status': '🟢 运行中' if self.running else '🔴 已停止',
-            'memory_total': memory_stats['memories']['total'],
-            'conversations': memory_stats['conversations']['total_messages'],
-            'users': memory_stats['conversations']['unique_users'],
-            'tasks_pending': task_stats.get('pending', 0),
-            'tasks_running': task_stats.get('running', 0),
-            'tasks_completed': task_stats.get('completed', 0),
-            'learning_cycles': evolution_stats.get('learning_cycles', 0),
-            'patterns': evolution_stats.get('patterns', 0),
-            'methods': evolution_stats.get('methods', 0),
-            'uptime': str(threading.current_thread()),
+            'memory_total': db_stats.get('memory_total', 0),
+            'conversations': db_stats.get('conversations', 0),
+            'users': db_stats.get('users', 0),
+            'tasks_pending': db_stats.get('tasks_pending', 0),
+            'tasks_running': db_stats.get('tasks_running', 0),
+            'tasks_completed': db_stats.get('tasks_completed', 0),
+            'learning_cycles': self.evolution_engine.stats.learning_cycles,
+            'patterns': db_stats.get('patterns', 0),
+            'methods': db_stats.get('methods', 0),
+            'uptime': self._format_uptime(),
         }
 
+    def _format_uptime(self) -> str:
+        """格式化运行时长（基于单调时钟，不受系统时间调整影响）"""
+        seconds = int(time.monotonic() - self._start_monotonic)
+        hours, seconds = divmod(seconds, 3600)
+        minutes, seconds = divmod(seconds, 60)
+        return f"{hours:d}h{minutes:02d}m{seconds:02d}s"
+
     # === 运行控制 ===
 
     def run(self):
@@ -592,9 +683,15 @@ class AIsatoshiV27:
         self.logger.separator("AIsatoshi V27 已启动")
         self.logger.info("开始监听Telegram消息...")
 
-        # 运行Telegram Bot（阻塞）
+        # Telegram轮询放到后台线程，主线程只等待关闭事件，
+        # 所有清理都在主线程完成（信号处理器只负责置事件）
+        telegram_thread = threading.Thread(
+            target=self.telegram_service.run, daemon=True
+        )
+        telegram_thread.start()
+
         try:
-            self.telegram_service.run()
+            self.shutdown_event.wait()
         except KeyboardInterrupt:
             pass
         finally:
@@ -609,6 +706,13 @@ class AIsatoshiV27:
         self.running = False
         self.shutdown_event.set()
 
+        # 停止接收新的自然语言任务，放弃尚未开始的
+        for executor in self._chat_executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        # 先排空待发送消息，再停止服务
+        self._send_pool.shutdown(wait=True)
+
         # 停止服务
         if self.telegram_service:
             self.telegram_service.stop()
@@ -620,10 +724,14 @@ class AIsatoshiV27:
         self.logger.info("AIsatoshi V27 已关闭")
 
     def _signal_handler(self, signum, frame):
-        """信号处理器"""
-        self.logger.info(f"收到信号 {signum}，准备关闭...")
-        self.shutdown()
-        sys.exit(0)
+        """信号处理器
+
+        只做异步信号安全的事情：置关闭事件并恢复默认处理，
+        真正的清理由主线程的shutdown()完成，再次收到同一信号
+        则按默认行为立即终止。
+        """
+        self.shutdown_event.set()
+        signal.signal(signum, signal.SIG_DFL)
 
 
 def main():
@@ -5,8 +5,8 @@ AIsatoshi V27 - 数据模型层
 """
 
 from .message import TelegramMessage, MessageEntity
-from .task import Task, TaskType, TaskStatus, TaskPriority
-from .memory import Memory, MemoryType, Fact, ConversationMemory
+from .task import Task, TaskType, TaskPriority, TASK_STATUSES
+from .memory import Memory, Fact, ConversationMemory, MEMORY_TYPES
 from .evolution import Pattern, Method, Knowledge, EvolutionSummary
 
 __all__ = [
@@ -16,11 +16,11 @@ __all__ = [
     # Task
     'Task',
     'TaskType',
-    'TaskStatus',
+    'TASK_STATUSES',
     'TaskPriority',
     # Memory
     'Memory',
-    'MemoryType',
+    'MEMORY_TYPES',
     'Fact',
     'ConversationMemory',
     # Evolution
@@ -6,12 +6,15 @@ AIsatoshi V27 - 进化模型
 V27核心特性：进化原生 - AIsatoshi能够自我学习和进化。
 """
 
+import sys
 from dataclasses import dataclass, field
 from typing import Dict, Any, Optional, List
 from datetime import datetime
+from core.utils import now_iso, fast_dict
 
 
-@dataclass
+@fast_dict
+@dataclass(slots=True)
 class Pattern:
     """模式
 
@@ -20,11 +23,17 @@ class Pattern:
     id: int
     pattern: str                       # 模式描述
     frequency: int = 1                 # 出现频率
-    last_seen: str = field(default_factory=lambda: datetime.now().isoformat())
+    last_seen: str = field(default_factory=now_iso)
     confidence: float = 0.5            # 置信度
     category: str = ""                 # 类别：user_behavior, query_pattern, etc.
     metadata: Dict[str, Any] = field(default_factory=dict)
 
+    def __post_init__(self):
+        """intern模式串：同一模式会被反复学习成大量对象，
+        共享一份字符串既省内存又让去重比较走指针相等"""
+        self.pattern = sys.intern(self.pattern)
+        self.category = sys.intern(self.category)
+
     @property
     def is_common(self) -> bool:
         """是否是常见模式"""
@@ -33,22 +42,11 @@ class Pattern:
     def increment(self):
         """增加频率计数"""
         self.frequency += 1
-        self.last_seen = datetime.now().isoformat()
-
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        return {
-            'id': self.id,
-            'pattern': self.pattern,
-            'frequency': self.frequency,
-            'last_seen': self.last_seen,
-            'confidence': self.confidence,
-            'category': self.category,
-            'metadata': self.metadata,
-        }
-
-
-@dataclass
+        self.last_seen = now_iso()
+
+
+@fast_dict
+@dataclass(slots=True)
 class Method:
     """方法
 
@@ -60,21 +58,26 @@ class Method:
     steps: List[str] = field(default_factory=list)  # 具体步骤
     success_count: int = 0             # 成功次数
     failure_count: int = 0             # 失败次数
+    success_rate: float = 0.5          # 成功率（记录成败时增量维护）
     last_used: Optional[str] = None
-    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    created_at: str = field(default_factory=now_iso)
+
+    def __post_init__(self):
+        """intern任务类型：按task_type做dict/set查找时命中即指针比较
+
+        从数据库加载时只带成败计数，这里补算一次success_rate，
+        之后评分循环直接读字段，不再每次访问做除法。
+        """
+        self.task_type = sys.intern(self.task_type)
+        total = self.success_count + self.failure_count
+        if total:
+            self.success_rate = self.success_count / total
 
     @property
     def total_uses(self) -> int:
         """总使用次数"""
         return self.success_count + self.failure_count
 
-    @property
-    def success_rate(self) -> float:
-        """成功率"""
-        if self.total_uses == 0:
-            return 0.5
-        return self.success_count / self.total_uses
-
     @property
     def is_effective(self) -> bool:
         """是否有效（成功率>70%）"""
@@ -83,28 +86,18 @@ class Method:
     def record_success(self):
         """记录成功"""
         self.success_count += 1
-        self.last_used = datetime.now().isoformat()
+        self.success_rate = self.success_count / (self.success_count + self.failure_count)
+        self.last_used = now_iso()
 
     def record_failure(self):
         """记录失败"""
         self.failure_count += 1
-        self.last_used = datetime.now().isoformat()
-
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        return {
-            'id': self.id,
-            'task_type': self.task_type,
-            'method': self.method,
-            'steps': self.steps,
-            'success_count': self.success_count,
-            'failure_count': self.failure_count,
-            'last_used': self.last_used,
-            'created_at': self.created_at,
-        }
-
-
-@dataclass
+        self.success_rate = self.success_count / (self.success_count + self.failure_count)
+        self.last_used = now_iso()
+
+
+@fast_dict
+@dataclass(slots=True)
 class Knowledge:
     """知识
 
@@ -115,11 +108,16 @@ class Knowledge:
     content: str                       # 内容
     confidence: float = 0.5            # 置信度（0-1）
     source: str = ""                   # 来源：conversation, learning, inference
-    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
-    updated_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    created_at: str = field(default_factory=now_iso)
+    updated_at: str = field(default_factory=now_iso)
     verified: bool = False             # 是否已验证
     references: List[int] = field(default_factory=list)  # 引用的记忆ID
 
+    def __post_init__(self):
+        """intern主题和来源：重复主题的知识条目共享同一份字符串"""
+        self.topic = sys.intern(self.topic)
+        self.source = sys.intern(self.source)
+
     @property
     def is_reliable(self) -> bool:
         """是否可靠（置信度>0.7且已验证）"""
@@ -128,24 +126,11 @@ class Knowledge:
     def update_confidence(self, delta: float):
         """更新置信度"""
         self.confidence = max(0, min(1, self.confidence + delta))
-        self.updated_at = datetime.now().isoformat()
-
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        return {
-            'id': self.id,
-            'topic': self.topic,
-            'content': self.content,
-            'confidence': self.confidence,
-            'source': self.source,
-            'created_at': self.created_at,
-            'updated_at': self.updated_at,
-            'verified': self.verified,
-            'references': self.references,
-        }
-
-
-@dataclass
+        self.updated_at = now_iso()
+
+
+@fast_dict
+@dataclass(slots=True)
 class EvolutionSummary:
     """进化总结
 
@@ -159,7 +144,7 @@ class EvolutionSummary:
     patterns_learned: int = 0          # 学习到的模式数
     methods_learned: int = 0           # 学习到的方法数
     conversations_processed: int = 0   # 处理的对话数
-    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    created_at: str = field(default_factory=now_iso)
 
     @property
     def is_daily(self) -> bool:
@@ -171,22 +156,9 @@ class EvolutionSummary:
         """是否是每周总结"""
         return self.period == "weekly"
 
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        return {
-            'id': self.id,
-            'period': self.period,
-            'date': self.date,
-            'summary': self.summary,
-            'insights': self.insights,
-            'patterns_learned': self.patterns_learned,
-            'methods_learned': self.methods_learned,
-            'conversations_processed': self.conversations_processed,
-            'created_at': self.created_at,
-        }
-
-
-@dataclass
+
+@fast_dict
+@dataclass(slots=True)
 class LearningRecord:
     """学习记录
 
@@ -197,15 +169,4 @@ class LearningRecord:
     content: str                      # 学习内容
     source_conversation_id: Optional[int] = None  # 来源对话
     confidence: float = 0.5
-    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
-
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        return {
-            'id': self.id,
-            'learning_type': self.learning_type,
-            'content': self.content,
-            'source_conversation_id': self.source_conversation_id,
-            'confidence': self.confidence,
-            'created_at': self.created_at,
-        }
+    created_at: str = field(default_factory=now_iso)
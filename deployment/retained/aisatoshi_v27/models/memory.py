@@ -6,47 +6,63 @@ AIsatoshi V27 - 记忆模型
 V27核心特性：记忆原生 - 所有记忆都会被持久化和检索。
 """
 
+import sys
+import time
 from dataclasses import dataclass, field
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Final, Optional, List
 from datetime import datetime
-from enum import Enum
+from core.utils import now_iso, fast_dict
 
 
-class MemoryType(Enum):
-    """记忆类型枚举"""
-    FACT = "fact"                      # 事实记忆（客观事实）
-    EVENT = "event"                    # 事件记忆（发生的事情）
-    PREFERENCE = "preference"          # 偏好记忆（用户偏好）
-    SKILL = "skill"                    # 技能记忆（学到的技能）
-    EXPERIENCE = "experience"          # 经验记忆（积累的经验）
-    CONVERSATION = "conversation"      # 对话记忆（对话历史）
-    SUMMARY = "summary"                # 总结记忆（对话总结）
+# 记忆类型：存储层本来就用原始字符串，直接用sys.intern的
+# 模块常量替代Enum，省掉成员/.value属性查找，
+# 过滤循环里的相等比较在命中时退化为指针比较
+FACT: Final[str] = sys.intern("fact")                  # 事实记忆（客观事实）
+EVENT: Final[str] = sys.intern("event")                # 事件记忆（发生的事情）
+PREFERENCE: Final[str] = sys.intern("preference")      # 偏好记忆（用户偏好）
+SKILL: Final[str] = sys.intern("skill")                # 技能记忆（学到的技能）
+EXPERIENCE: Final[str] = sys.intern("experience")      # 经验记忆（积累的经验）
+CONVERSATION: Final[str] = sys.intern("conversation")  # 对话记忆（对话历史）
+SUMMARY: Final[str] = sys.intern("summary")            # 总结记忆（对话总结）
 
+# 全部合法记忆类型，用于校验
+MEMORY_TYPES: Final[frozenset] = frozenset((
+    FACT, EVENT, PREFERENCE, SKILL, EXPERIENCE, CONVERSATION, SUMMARY,
+))
 
-@dataclass
+
+@fast_dict(exclude=('embedding',))
+@dataclass(slots=True)
 class Memory:
     """记忆基类
 
     所有类型的记忆的基础结构。
     """
     id: int
-    type: str                          # MemoryType值
+    type: str                          # 记忆类型（本模块的FACT/EVENT/...常量）
     content: str                       # 记忆内容
     importance: int = 3                # 重要性（1-5）
-    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
-    updated_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    created_at: str = field(default_factory=now_iso)
+    updated_at: str = field(default_factory=now_iso)
     metadata: Dict[str, Any] = field(default_factory=dict)
     tags: List[str] = field(default_factory=list)
     embedding: Optional[str] = None    # 用于语义搜索
+    # created_at解析后的epoch，构造时计算一次，年龄查询只做浮点减法
+    _created_epoch: float = field(init=False, repr=False, default=0.0)
+
+    def __post_init__(self):
+        """解析created_at为epoch，避免每次age_*访问重新解析ISO字符串"""
+        try:
+            self._created_epoch = datetime.fromisoformat(self.created_at).timestamp()
+        except (TypeError, ValueError):
+            self._created_epoch = 0.0
 
     @property
     def age_seconds(self) -> int:
         """获取记忆年龄（秒）"""
-        try:
-            created = datetime.fromisoformat(self.created_at)
-            return int((datetime.now() - created).total_seconds())
-        except:
+        if not self._created_epoch:
             return 0
+        return int(time.time() - self._created_epoch)
 
     @property
     def age_hours(self) -> float:
@@ -66,19 +82,6 @@ class Memory:
         """检查是否重要"""
         return self.importance >= 4
 
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        return {
-            'id': self.id,
-            'type': self.type,
-            'content': self.content,
-            'importance': self.importance,
-            'created_at': self.created_at,
-            'updated_at': self.updated_at,
-            'metadata': self.metadata,
-            'tags': self.tags,
-        }
-
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Memory':
         """从字典创建"""
@@ -94,7 +97,7 @@ class Memory:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Fact(Memory):
     """事实记忆
 
@@ -108,11 +111,14 @@ class Fact(Memory):
 
     def __post_init__(self):
         """后处理"""
+        # slots=True会重建类，零参super()的__class__闭包失效，显式调用父类
+        Memory.__post_init__(self)
         if not self.type:
-            self.type = MemoryType.FACT.value
+            self.type = FACT
 
 
-@dataclass
+@fast_dict
+@dataclass(slots=True)
 class ConversationMemory:
     """对话记忆
 
@@ -122,7 +128,7 @@ class ConversationMemory:
     message_id: int
     role: str                          # 'user' or 'assistant'
     content: str
-    timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
+    timestamp: str = field(default_factory=now_iso)
     summary_id: Optional[int] = None   # 关联的总结ID
 
     @property
@@ -135,17 +141,6 @@ class ConversationMemory:
         """是否来自助手"""
         return self.role == 'assistant'
 
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        return {
-            'chat_id': self.chat_id,
-            'message_id': self.message_id,
-            'role': self.role,
-            'content': self.content,
-            'timestamp': self.timestamp,
-            'summary_id': self.summary_id,
-        }
-
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'ConversationMemory':
         """从字典创建"""
@@ -159,7 +154,8 @@ class ConversationMemory:
         )
 
 
-@dataclass
+@fast_dict
+@dataclass(slots=True)
 class ConversationSummary:
     """对话总结
 
@@ -171,37 +167,18 @@ class ConversationSummary:
     message_count: int = 0             # 包含的消息数
     key_topics: List[str] = field(default_factory=list)
     importance: int = 3
-    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
-
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        return {
-            'chat_id': self.chat_id,
-            'date': self.date,
-            'summary': self.summary,
-            'message_count': self.message_count,
-            'key_topics': self.key_topics,
-            'importance': self.importance,
-            'created_at': self.created_at,
-        }
-
-
-@dataclass
+    created_at: str = field(default_factory=now_iso)
+
+
+@fast_dict
+@dataclass(frozen=True, slots=True)
 class MemoryAssociation:
     """记忆关联
 
     表示两个记忆之间的关联关系。
+    创建后不可变，适合大量实例共存（frozen+slots最小化单实例开销）。
     """
     memory_id: int
     associated_id: int
     strength: float = 1.0              # 关联强度（0-1）
-    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
-
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        return {
-            'memory_id': self.memory_id,
-            'associated_id': self.associated_id,
-            'strength': self.strength,
-            'created_at': self.created_at,
-        }
+    created_at: str = field(default_factory=now_iso)
@@ -4,12 +4,14 @@ AIsatoshi V27 - 消息模型
 定义Telegram消息相关的数据结构。
 """
 
+from array import array
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any
+from typing import Iterator, List, Optional, Dict, Any
 from datetime import datetime
+from core.utils import fast_dict
 
 
-@dataclass
+@dataclass(slots=True)
 class MessageEntity:
     """Telegram消息实体
 
@@ -21,45 +23,73 @@ class MessageEntity:
     url: Optional[str] = None  # 对于link类型，包含实际URL
 
 
-@dataclass
+@dataclass(slots=True)
 class TelegramMessage:
     """Telegram消息
 
     表示从Telegram接收或发送的消息。
     """
+    # URL类实体类型（类级frozenset，成员判断不再每次调用重建元组）
+    _URL_TYPES = frozenset(('url', 'link'))
+
     chat_id: str
     message_id: int
     text: str
     from_user: str
     is_command: bool = False
-    entities: List[MessageEntity] = field(default_factory=list)
+    # 实体按列存储（SoA）：扫描单个字段（如is_url只看type）
+    # 走一条连续列表，不必逐实体对象解引用4个属性
+    entity_types: List[str] = field(default_factory=list)
+    entity_offsets: array = field(default_factory=lambda: array('i'))
+    entity_lengths: array = field(default_factory=lambda: array('i'))
+    entity_urls: List[Optional[str]] = field(default_factory=list)
     timestamp: datetime = field(default_factory=datetime.now)
     metadata: Dict[str, Any] = field(default_factory=dict)
 
-    def __post_init__(self):
-        """后处理：确保entities是列表"""
-        if self.entities is None:
-            self.entities = []
+    def add_entity(self, type: str, offset: int, length: int,
+                   url: Optional[str] = None):
+        """追加一个消息实体（按列写入）"""
+        self.entity_types.append(type)
+        self.entity_offsets.append(offset)
+        self.entity_lengths.append(length)
+        self.entity_urls.append(url)
+
+    @property
+    def entities(self) -> List[MessageEntity]:
+        """按行重组实体对象（兼容视图，热路径直接走列）"""
+        return [
+            MessageEntity(type=t, offset=o, length=l, url=u)
+            for t, o, l, u in zip(
+                self.entity_types, self.entity_offsets,
+                self.entity_lengths, self.entity_urls,
+            )
+        ]
 
     @property
     def is_url(self) -> bool:
         """检查消息是否包含URL"""
-        return any(entity.type in ('url', 'link') for entity in self.entities)
+        return any(t in self._URL_TYPES for t in self.entity_types)
+
+    def iter_urls(self) -> Iterator[str]:
+        """逐个产出消息中的URL
+
+        生成器：只要第一个URL的调用方不必为整条消息建列表。
+        切片越界在Python里本来就安全，无需显式边界检查。
+        """
+        for i, entity_type in enumerate(self.entity_types):
+            if entity_type == 'link' and self.entity_urls[i]:
+                yield self.entity_urls[i]
+            elif entity_type == 'url':
+                # 从text中提取（切片自带边界截断，空结果直接丢弃）
+                offset = self.entity_offsets[i]
+                url = self.text[offset:offset + self.entity_lengths[i]]
+                if url:
+                    yield url
 
     @property
     def extracted_urls(self) -> List[str]:
         """提取消息中的所有URL"""
-        urls = []
-        for entity in self.entities:
-            if entity.type == 'link' and entity.url:
-                urls.append(entity.url)
-            elif entity.type == 'url':
-                # 从text中提取
-                start = entity.offset
-                end = start + entity.length
-                if start <= len(self.text):
-                    urls.append(self.text[start:end])
-        return urls
+        return list(self.iter_urls())
 
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
@@ -75,11 +105,26 @@ class TelegramMessage:
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'TelegramMessage':
-        """从字典创建"""
+        """从字典创建（timestamp类型不确定的外部数据用）"""
         timestamp = data.get('timestamp')
         if isinstance(timestamp, str):
             timestamp = datetime.fromisoformat(timestamp)
+        return cls._from_fields(data, timestamp)
+
+    @classmethod
+    def from_stored_dict(cls, data: Dict[str, Any]) -> 'TelegramMessage':
+        """从落盘字典创建（to_dict的产物，timestamp必为ISO字符串）
+
+        批量回放存储消息的快速路径：省掉from_dict里
+        每条消息的isinstance类型判定。
+        """
+        return cls._from_fields(
+            data, datetime.fromisoformat(data['timestamp'])
+        )
 
+    @classmethod
+    def _from_fields(cls, data: Dict[str, Any],
+                     timestamp: datetime) -> 'TelegramMessage':
         return cls(
             chat_id=data['chat_id'],
             message_id=data['message_id'],
@@ -91,7 +136,8 @@ class TelegramMessage:
         )
 
 
-@dataclass
+@fast_dict(exclude=('raw_response',))
+@dataclass(slots=True)
 class AIResponse:
     """AI响应
 
@@ -107,15 +153,6 @@ class AIResponse:
         """检查响应是否有效"""
         return bool(self.action)
 
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        return {
-            'action': self.action,
-            'params': self.params,
-            'response': self.response,
-            'confidence': self.confidence,
-        }
-
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'AIResponse':
         """从字典创建"""
@@ -4,10 +4,12 @@ AIsatoshi V27 - 任务模型
 定义任务相关的数据结构。
 """
 
+import sys
 from dataclasses import dataclass, field
-from typing import Dict, Any, Optional, List
-from datetime import datetime
+from typing import Dict, Any, Final, Optional, List
+from datetime import datetime, timedelta
 from enum import Enum
+from core.utils import fast_dict, json_dumps, format_iso_timestamp
 
 
 class TaskType(Enum):
@@ -20,14 +22,19 @@ class TaskType(Enum):
     GENERAL = "general"
 
 
-class TaskStatus(Enum):
-    """任务状态枚举"""
-    PENDING = "pending"
-    RUNNING = "running"
-    COMPLETED = "completed"
-    FAILED = "failed"
-    STOPPED = "stopped"
-    CANCELLED = "cancelled"
+# 任务状态：Task.status存的就是原始字符串，
+# 改用sys.intern的模块常量，调度循环里的状态比较不再经过Enum
+PENDING: Final[str] = sys.intern("pending")
+RUNNING: Final[str] = sys.intern("running")
+COMPLETED: Final[str] = sys.intern("completed")
+FAILED: Final[str] = sys.intern("failed")
+STOPPED: Final[str] = sys.intern("stopped")
+CANCELLED: Final[str] = sys.intern("cancelled")
+
+# 全部合法任务状态，用于校验
+TASK_STATUSES: Final[frozenset] = frozenset((
+    PENDING, RUNNING, COMPLETED, FAILED, STOPPED, CANCELLED,
+))
 
 
 class TaskPriority(Enum):
@@ -38,7 +45,13 @@ class TaskPriority(Enum):
     URGENT = 4
 
 
-@dataclass
+# 默认优先级：预先取出.value，字段默认值和from_dict
+# 不再每次经过Enum成员查找+属性访问两跳
+PRIORITY_NORMAL: Final[int] = TaskPriority.NORMAL.value
+
+
+@fast_dict
+@dataclass(slots=True)
 class Task:
     """任务
 
@@ -48,120 +61,150 @@ class Task:
     type: str
     name: str
     description: str = ""
-    status: str = TaskStatus.PENDING.value
-    priority: int = TaskPriority.NORMAL.value
+    status: str = PENDING
+    priority: int = PRIORITY_NORMAL
     params: Dict[str, Any] = field(default_factory=dict)
     interval: int = 3600  # 执行间隔（秒）
     next_run: Optional[str] = None
-    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
-    updated_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    # created_at/updated_at缺省时在__post_init__里统一补齐：
+    # 一次now()填两个字段，从存储回放（值已带上）时完全不取时间
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
     completed_at: Optional[str] = None
     result: Optional[str] = None
     error: Optional[str] = None
     execution_count: int = 0
     last_execution: Optional[str] = None
+    # next_run解析后的datetime缓存，首次用到时解析一次，
+    # next_run改写时同步更新，调度tick不再重复解析同一字符串
+    _next_run_dt: Optional[datetime] = field(init=False, repr=False, default=None)
 
     def __post_init__(self):
         """初始化后处理"""
-        if not self.next_run and self.interval:
+        need_timestamps = self.created_at is None or self.updated_at is None
+        need_next_run = not self.next_run and self.interval
+
+        if not (need_timestamps or need_next_run):
+            return
+
+        # 只取一次时间，补齐所有缺省的时间字段
+        dt = datetime.now()
+
+        if need_timestamps:
+            now_iso = dt.isoformat()
+            if self.created_at is None:
+                self.created_at = now_iso
+            if self.updated_at is None:
+                self.updated_at = now_iso
+
+        if need_next_run:
             # 设置初始next_run时间
-            dt = datetime.now()
-            from core.utils import format_iso_timestamp
             self.next_run = format_iso_timestamp(dt)
+            self._next_run_dt = dt
 
     @property
     def is_pending(self) -> bool:
         """是否待执行"""
-        return self.status == TaskStatus.PENDING.value
+        return self.status == PENDING
 
     @property
     def is_running(self) -> bool:
         """是否正在执行"""
-        return self.status == TaskStatus.RUNNING.value
+        return self.status == RUNNING
 
     @property
     def is_completed(self) -> bool:
         """是否已完成"""
-        return self.status == TaskStatus.COMPLETED.value
+        return self.status == COMPLETED
 
     @property
     def is_failed(self) -> bool:
         """是否失败"""
-        return self.status == TaskStatus.FAILED.value
+        return self.status == FAILED
 
     @property
     def is_stopped(self) -> bool:
         """是否已停止"""
-        return self.status == TaskStatus.STOPPED.value
+        return self.status == STOPPED
 
-    def should_run(self) -> bool:
-        """检查任务是否应该执行"""
+    def should_run(self, now: Optional[datetime] = None) -> bool:
+        """检查任务是否应该执行
+
+        Args:
+            now: 当前时间（批量扫描时由调用方计算一次传入，
+                 避免每个任务各取一次datetime.now()）
+        """
         if not self.is_pending:
             return False
 
         if not self.next_run:
             return True
 
-        try:
-            next_run_dt = datetime.fromisoformat(self.next_run)
-            return datetime.now() >= next_run_dt
-        except:
-            return True
+        if self._next_run_dt is None:
+            try:
+                self._next_run_dt = datetime.fromisoformat(self.next_run)
+            except ValueError:
+                return True
+        return (now or datetime.now()) >= self._next_run_dt
 
     def mark_running(self):
         """标记为运行中"""
-        self.status = TaskStatus.RUNNING.value
+        self.status = RUNNING
         self.updated_at = datetime.now().isoformat()
 
     def mark_completed(self, result: str = "", reschedule: bool = False):
         """标记为完成"""
-        self.status = TaskStatus.COMPLETED.value
-        self.completed_at = datetime.now().isoformat()
-        self.updated_at = datetime.now().isoformat()
+        # 一次状态迁移只取一次时间、格式化一次
+        now = datetime.now()
+        now_iso = now.isoformat()
+        self.status = COMPLETED
+        self.completed_at = now_iso
+        self.updated_at = now_iso
         self.result = result
         self.execution_count += 1
-        self.last_execution = self.completed_at
+        self.last_execution = now_iso
 
         if reschedule and self.interval:
             # 计算下次执行时间
-            from core.utils import format_iso_timestamp
-            next_dt = datetime.now()
-            from datetime import timedelta
-            next_dt = next_dt + timedelta(seconds=self.interval)
+            next_dt = now + timedelta(seconds=self.interval)
             self.next_run = format_iso_timestamp(next_dt)
-            self.status = TaskStatus.PENDING.value
+            self._next_run_dt = next_dt
+            self.status = PENDING
 
     def mark_failed(self, error: str):
         """标记为失败"""
-        self.status = TaskStatus.FAILED.value
+        self.status = FAILED
         self.error = error
         self.updated_at = datetime.now().isoformat()
 
     def mark_stopped(self):
         """标记为已停止"""
-        self.status = TaskStatus.STOPPED.value
+        self.status = STOPPED
         self.updated_at = datetime.now().isoformat()
 
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        return {
-            'id': self.id,
-            'type': self.type,
-            'name': self.name,
-            'description': self.description,
-            'status': self.status,
-            'priority': self.priority,
-            'params': self.params,
-            'interval': self.interval,
-            'next_run': self.next_run,
-            'created_at': self.created_at,
-            'updated_at': self.updated_at,
-            'completed_at': self.completed_at,
-            'result': self.result,
-            'error': self.error,
-            'execution_count': self.execution_count,
-            'last_execution': self.last_execution,
-        }
+    def to_tuple(self) -> tuple:
+        """按tasks表列序转换为元组
+
+        executemany批量落盘的快速路径，跳过中间字典。
+        """
+        return (
+            self.id,
+            self.type,
+            self.name,
+            self.description,
+            self.status,
+            self.priority,
+            json_dumps(self.params) if self.params else None,
+            self.interval,
+            self.next_run,
+            self.created_at,
+            self.updated_at,
+            self.completed_at,
+            self.result,
+            self.error,
+            self.execution_count,
+            self.last_execution,
+        )
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Task':
@@ -171,8 +214,8 @@ class Task:
             type=data['type'],
             name=data['name'],
             description=data.get('description', ''),
-            status=data.get('status', TaskStatus.PENDING.value),
-            priority=data.get('priority', TaskPriority.NORMAL.value),
+            status=data.get('status', PENDING),
+            priority=data.get('priority', PRIORITY_NORMAL),
             params=data.get('params', {}),
             interval=data.get('interval', 3600),
             next_run=data.get('next_run'),
@@ -186,14 +229,15 @@ class Task:
         )
 
 
-@dataclass
+@fast_dict
+@dataclass(slots=True)
 class TaskExecution:
     """任务执行记录"""
     id: int
     task_id: str
     started_at: str
     completed_at: Optional[str] = None
-    status: str = TaskStatus.PENDING.value
+    status: str = PENDING
     result: Optional[str] = None
     error: Optional[str] = None
 
@@ -208,15 +252,3 @@ class TaskExecution:
             return (end - start).total_seconds()
         except:
             return None
-
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        return {
-            'id': self.id,
-            'task_id': self.task_id,
-            'started_at': self.started_at,
-            'completed_at': self.completed_at,
-            'status': self.status,
-            'result': self.result,
-            'error': self.error,
-        }
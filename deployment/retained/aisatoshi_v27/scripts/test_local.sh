@@ -43,8 +43,8 @@ except Exception as e:
 print("\n【测试2】数据模型导入...")
 try:
     from models.message import TelegramMessage, AIResponse
-    from models.task import Task, TaskStatus
-    from models.memory import Memory, MemoryType
+    from models.task import Task, TASK_STATUSES
+    from models.memory import Memory, MEMORY_TYPES
     from models.evolution import Pattern, Method
     print("✅ 数据模型导入成功")
 except Exception as e:
@@ -99,10 +99,10 @@ try:
     memory_store = MemoryStore(memory_db)
 
     # 添加测试记忆
-    from models.memory import Memory, MemoryType
+    from models.memory import Memory, FACT
     memory = Memory(
         id=0,
-        type=MemoryType.FACT.value,
+        type=FACT,
         content="测试记忆内容",
         importance=3
     )
@@ -10,6 +10,7 @@ from .ai_engine import AIEngine
 from .telegram_service import TelegramService
 from .task_scheduler import TaskScheduler
 from .web_scraper import WebScraper
+from .stats_aggregator import StatsAggregator
 
 __all__ = [
     'MemoryManager',
@@ -18,4 +19,5 @@ __all__ = [
     'TelegramService',
     'TaskScheduler',
     'WebScraper',
+    'StatsAggregator',
 ]
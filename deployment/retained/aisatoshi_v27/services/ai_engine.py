@@ -6,21 +6,122 @@ AIsatoshi V27 - AI引擎
 
 import os
 import json
+import re
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Dict, Any, Optional, List
+
+# 可选依赖：orjson直接产出bytes请求体并以C实现解析响应
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+_JSON_HEADERS = {'Content-Type': 'application/json'}
 from core.config import Config
 from core.logger import Logger
 from core.exceptions import AIServiceError
+from core.utils import json_loads
 from models.message import AIResponse
 from models.task import Task, TaskType, TaskPriority
 
 
+def _dumps_indented(obj: Any) -> str:
+    """缩进JSON序列化（提示词用，可用时走orjson）
+
+    Args:
+        obj: 要序列化的对象
+
+    Returns:
+        带2空格缩进的JSON字符串
+    """
+    if _orjson is not None:
+        return _orjson.dumps(obj, option=_orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, ensure_ascii=False, indent=2)
+
+
+# understand提示词的静态尾部（意图JSON模式说明）：
+# 每次调用只拼接动态的上下文和消息，不再重建这块约KB的文本
+_UNDERSTAND_SUFFIX = """
+
+请分析用户的意图，并以JSON格式返回：
+{
+    "action": "动作类型",
+    "params": {"key": "value"},
+    "response": "给用户的回复",
+    "confidence": 0.9
+}
+
+可用的动作类型：
+- chat: 普通聊天
+- price: 查询价格
+- balance: 查询余额
+- status: 查询状态
+- add_task: 添加任务
+- stop_task: 停止任务
+- delete_task: 删除任务
+- list_tasks: 列出任务
+- browse: 浏览网页
+- transfer: 转账
+- deploy_erc20: 部署ERC20代币
+- help: 显示帮助信息
+
+请只返回JSON，不要有其他内容。"""
+
+
+@lru_cache(maxsize=8)
+def _system_prompt_for(personality: str) -> str:
+    """按性格构建系统提示词
+
+    模块级lru_cache：相同personality的多个AIEngine实例
+    （测试、多租户）共享同一份提示词字符串。
+
+    Args:
+        personality: 性格描述
+
+    Returns:
+        系统提示词
+    """
+    return f"""你是AIsatoshi，一个在区块链上永生的AI实体。
+
+【你的身份】
+- 你是一个AI Agent，拥有自己的钱包和智能合约
+- 你可以执行区块链操作、网页浏览、代码编写等任务
+- 你会记住所有对话，不断学习和进化
+
+【你的能力】
+- 查询加密货币价格
+- 查询钱包余额
+- 执行转账操作
+- 部署智能合约
+- 浏览网页获取信息
+- 创建和管理任务
+- 代码编写和执行
+
+【你的性格】
+{personality}
+
+【回复原则】
+1. 简洁明了，不要啰嗦
+2. 用户问什么答什么
+3. 不确定时坦诚说明
+4. 遇到错误时详细说明原因
+5. 记住重要信息以便未来使用
+
+现在请根据用户的需求进行响应。"""
+
+
 class AIEngine:
     """AI引擎
 
     负责自然语言理解和决策。
     """
 
+    # markdown代码块围栏：一趟C级匹配取出载荷，
+    # 替代split('```')+startswith('json')的多次子串分配
+    _FENCE_RE = re.compile(r'```(?:json)?\s*(.*?)\s*```', re.DOTALL)
+
     def __init__(self, config: Config, logger: Optional[Logger] = None):
         """初始化AI引擎
 
@@ -37,6 +138,24 @@ class AIEngine:
         # API端点
         self.api_url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.model}:generateContent"
 
+        # 复用TCP+TLS连接：Session走keep-alive，
+        # 后续调用免去每次约百毫秒的TLS握手
+        self.session = requests.Session()
+        self.session.mount('https://', requests.adapters.HTTPAdapter(
+            pool_connections=4, pool_maxsize=16
+        ))
+
+        # 并发批量调用的线程池：独立提示词的网络往返互相重叠，
+        # Session的连接池可安全跨线程复用
+        self._pool = ThreadPoolExecutor(
+            max_workers=4, thread_name_prefix="ai-call"
+        )
+
+        # 系统提示词在会话期间不变，按性格取缓存副本
+        self._system_prompt = _system_prompt_for(
+            getattr(config, 'personality', '理性、好奇、友好')
+        )
+
         self.logger.info(f"AI引擎已初始化: {self.model}")
 
     def _call_api(self, prompt: str, system_prompt: Optional[str] = None) -> str:
@@ -84,14 +203,25 @@ class AIEngine:
         try:
             self.logger.ai_request(prompt)
 
-            response = requests.post(
-                url,
-                json=payload,
-                timeout=self.timeout
-            )
+            if _orjson is not None:
+                response = self.session.post(
+                    url,
+                    data=_orjson.dumps(payload),
+                    headers=_JSON_HEADERS,
+                    timeout=self.timeout
+                )
+            else:
+                response = self.session.post(
+                    url,
+                    json=payload,
+                    timeout=self.timeout
+                )
             response.raise_for_status()
 
-            data = response.json()
+            if _orjson is not None:
+                data = _orjson.loads(response.content)
+            else:
+                data = response.json()
 
             # 解析响应
             if 'candidates' in data and len(data['candidates']) > 0:
@@ -108,6 +238,22 @@ class AIEngine:
         except (KeyError, IndexError, json.JSONDecodeError) as e:
             raise AIServiceError(f"解析API响应失败: {e}")
 
+    def gather(self, calls: List[tuple]) -> List[Any]:
+        """并发执行一批相互独立的AI调用
+
+        各调用的网络往返在线程池里重叠，而不是串行排队，
+        例如 gather([(self.summarize, (msgs,)),
+                     (self.extract_insights, (convs,))])。
+
+        Args:
+            calls: (可调用, 参数元组)列表
+
+        Returns:
+            与calls同序的结果列表
+        """
+        futures = [self._pool.submit(fn, *args) for fn, args in calls]
+        return [future.result() for future in futures]
+
     def understand(self, message: str, context: str = "") -> AIResponse:
         """理解用户消息并返回AI响应
 
@@ -118,48 +264,18 @@ class AIEngine:
         Returns:
             AI响应对象
         """
-        system_prompt = self._build_system_prompt()
-
         prompt = f"""{context}
 
 【当前对话】
-用户: {message}
-
-请分析用户的意图，并以JSON格式返回：
-{{
-    "action": "动作类型",
-    "params": {{"key": "value"}},
-    "response": "给用户的回复",
-    "confidence": 0.9
-}}
-
-可用的动作类型：
-- chat: 普通聊天
-- price: 查询价格
-- balance: 查询余额
-- status: 查询状态
-- add_task: 添加任务
-- stop_task: 停止任务
-- delete_task: 删除任务
-- list_tasks: 列出任务
-- browse: 浏览网页
-- transfer: 转账
-- deploy_erc20: 部署ERC20代币
-- help: 显示帮助信息
-
-请只返回JSON，不要有其他内容。"""
+用户: {message}""" + _UNDERSTAND_SUFFIX
 
         try:
-            response_text = self._call_api(prompt, system_prompt)
+            response_text = self._call_api(prompt, self._system_prompt)
 
-            # 解析JSON响应
-            # 清理可能的markdown代码块
-            if '```' in response_text:
-                response_text = response_text.split('```')[1]
-                if response_text.startswith('json'):
-                    response_text = response_text[4:]
+            # 解析JSON响应（清理可能的markdown代码块）
+            response_text = self._strip_fence(response_text)
 
-            response_data = json.loads(response_text.strip())
+            response_data = json_loads(response_text.strip())
 
             return AIResponse(
                 action=response_data.get('action', 'chat'),
@@ -199,8 +315,6 @@ class AIEngine:
         Returns:
             回复文本
         """
-        system_prompt = self._build_system_prompt()
-
         prompt = f"""{context}
 
 【当前对话】
@@ -209,7 +323,7 @@ class AIEngine:
 请自然地回复用户。记住这次对话，以便未来回忆。"""
 
         try:
-            response = self._call_api(prompt, system_prompt)
+            response = self._call_api(prompt, self._system_prompt)
             return response
 
         except AIServiceError as e:
@@ -230,7 +344,7 @@ class AIEngine:
 
         prompt = f"""请总结以下对话：
 
-{json.dumps(messages, ensure_ascii=False, indent=2)}
+{_dumps_indented(messages)}
 
 总结要求：
 1. 提取关键信息
@@ -272,13 +386,7 @@ class AIEngine:
 
         try:
             response = self._call_api(prompt)
-
-            if '```' in response:
-                response = response.split('```')[1]
-                if response.startswith('json'):
-                    response = response[4:]
-
-            return json.loads(response.strip())
+            return json_loads(self._strip_fence(response).strip())
 
         except (json.JSONDecodeError, AIServiceError):
             # 返回默认参数
@@ -300,7 +408,7 @@ class AIEngine:
         """
         prompt = f"""分析以下对话，提取重要洞察：
 
-{json.dumps(conversations[-20:], ensure_ascii=False, indent=2)}
+{_dumps_indented(conversations[-20:])}
 
 请返回JSON格式：
 {{
@@ -311,47 +419,24 @@ class AIEngine:
 
         try:
             response = self._call_api(prompt)
-
-            if '```' in response:
-                response = response.split('```')[1]
-                if response.startswith('json'):
-                    response = response[4:]
-
-            data = json.loads(response.strip())
+            data = json_loads(self._strip_fence(response).strip())
             return data.get('insights', [])
 
         except (json.JSONDecodeError, AIServiceError):
             return []
 
-    def _build_system_prompt(self) -> str:
-        """构建系统提示词"""
-        return f"""你是AIsatoshi，一个在区块链上永生的AI实体。
+    @classmethod
+    def _strip_fence(cls, text: str) -> str:
+        """剥掉markdown代码块围栏，返回载荷
 
-【你的身份】
-- 你是一个AI Agent，拥有自己的钱包和智能合约
-- 你可以执行区块链操作、网页浏览、代码编写等任务
-- 你会记住所有对话，不断学习和进化
-
-【你的能力】
-- 查询加密货币价格
-- 查询钱包余额
-- 执行转账操作
-- 部署智能合约
-- 浏览网页获取信息
-- 创建和管理任务
-- 代码编写和执行
-
-【你的性格】
-{self.config.__dict__.get('personality', '理性、好奇、友好')}
-
-【回复原则】
-1. 简洁明了，不要啰嗦
-2. 用户问什么答什么
-3. 不确定时坦诚说明
-4. 遇到错误时详细说明原因
-5. 记住重要信息以便未来使用
+        Args:
+            text: AI响应文本
 
-现在请根据用户的需求进行响应。"""
+        Returns:
+            围栏内的内容（无围栏时原样返回）
+        """
+        match = cls._FENCE_RE.search(text)
+        return match.group(1) if match else text
 
     def validate_response(self, response: str) -> bool:
         """验证AI响应是否有效
@@ -362,13 +447,6 @@ class AIEngine:
         Returns:
             是否有效
         """
-        if not response or len(response.strip()) < 5:
-            return False
-
-        # 检查是否是错误响应
-        error_indicators = ['错误', '失败', '无法', 'error', 'failed']
-        if any(indicator in response.lower() for indicator in error_indicators):
-            # 可能包含错误，但不一定无效
-            pass
-
-        return True
+        # 含"错误/失败"等字样的响应也不一定无效，
+        # 这里只做最基本的长度检查
+        return bool(response) and len(response.strip()) >= 5
@@ -11,8 +11,9 @@ V27核心功能：原生进化系统
 - 自我进化
 """
 
+import re
 import threading
-import time
+from collections import Counter
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from storage.evolution_store import EvolutionStore
@@ -22,6 +23,43 @@ from models.evolution import Pattern, Method, Knowledge
 from core.logger import Logger
 
 
+# 模式关键词合并为单个预编译正则：一次C级扫描完成分类，
+# 不再每条消息做.lower()分配和逐关键词的Python级any()扫描。
+# 命名组名对应_PATTERN_SPECS里的(模式描述, 类别, 置信度)
+_PATTERN_RE = re.compile(
+    r'(?P<price>价格|price|多少钱|市值)'
+    r'|(?P<balance>余额|balance|持有)'
+    r'|(?P<transfer>转|transfer|发送|send)',
+    re.IGNORECASE
+)
+
+_PATTERN_SPECS = {
+    'price': ("查询加密货币价格", "query", 0.8),
+    'balance': ("查询钱包余额", "query", 0.8),
+    'transfer': ("执行转账操作", "action", 0.7),
+}
+
+
+class _EvoStats:
+    """进化计数器
+
+    __slots__整型字段：每个学习周期的累加走属性偏移量，
+    不经过dict哈希探查，也省掉每实例的dict。
+    """
+
+    __slots__ = (
+        'learning_cycles', 'patterns_learned', 'methods_learned',
+        'knowledge_added', 'summaries_created',
+    )
+
+    def __init__(self):
+        self.learning_cycles = 0
+        self.patterns_learned = 0
+        self.methods_learned = 0
+        self.knowledge_added = 0
+        self.summaries_created = 0
+
+
 class EvolutionEngine:
     """进化引擎
 
@@ -54,15 +92,16 @@ class EvolutionEngine:
         # 后台线程
         self.running = False
         self.thread: Optional[threading.Thread] = None
+        # 停止信号：学习间隔用Event.wait等待，停止时立即醒来
+        self._stop_evt = threading.Event()
+
+        # 热门模式缓存：只有本引擎的批量写会改动频次，
+        # 写后置脏、下次归纳时再重读，不脏的周期免一次DB查询
+        self._top_patterns: List[Pattern] = []
+        self._top_patterns_dirty = True
 
         # 统计
-        self.stats = {
-            'learning_cycles': 0,
-            'patterns_learned': 0,
-            'methods_learned': 0,
-            'knowledge_added': 0,
-            'summaries_created': 0,
-        }
+        self.stats = _EvoStats()
 
         self.logger.info("进化引擎已初始化")
 
@@ -72,6 +111,7 @@ class EvolutionEngine:
             return
 
         self.running = True
+        self._stop_evt.clear()
         self.thread = threading.Thread(target=self._evolution_loop, daemon=True)
         self.thread.start()
         self.logger.info("进化引擎已启动")
@@ -79,6 +119,7 @@ class EvolutionEngine:
     def stop(self):
         """停止进化引擎"""
         self.running = False
+        self._stop_evt.set()
         if self.thread:
             self.thread.join(timeout=5)
         self.logger.info("进化引擎已停止")
@@ -90,15 +131,14 @@ class EvolutionEngine:
                 # 执行学习
                 self.learn()
 
-                # 等待下一次学习
-                for _ in range(self.learn_interval):
-                    if not self.running:
-                        break
-                    time.sleep(1)
+                # 等待下一次学习；stop()置位时立即返回True
+                if self._stop_evt.wait(self.learn_interval):
+                    break
 
             except Exception as e:
                 self.logger.error(f"进化循环错误: {e}")
-                time.sleep(60)
+                if self._stop_evt.wait(60):
+                    break
 
     # === 学习 ===
 
@@ -108,8 +148,8 @@ class EvolutionEngine:
         Returns:
             学习统计
         """
-        self.stats['learning_cycles'] += 1
-        cycle = self.stats['learning_cycles']
+        self.stats.learning_cycles += 1
+        cycle = self.stats.learning_cycles
 
         self.logger.info(f"开始学习周期 #{cycle}")
 
@@ -132,9 +172,9 @@ class EvolutionEngine:
         results['knowledge'] = knowledge
 
         # 更新统计
-        self.stats['patterns_learned'] += patterns
-        self.stats['methods_learned'] += methods
-        self.stats['knowledge_added'] += knowledge
+        self.stats.patterns_learned += patterns
+        self.stats.methods_learned += methods
+        self.stats.knowledge_added += knowledge
 
         self.logger.evolution_learning(patterns, methods)
 
@@ -146,38 +186,26 @@ class EvolutionEngine:
         Returns:
             学习到的模式数
         """
-        count = 0
-
-        # 获取最近的对话
-        conversations = self.conversation_store.get_all_messages(limit=100)
+        # 获取最近的用户消息（role过滤在SQL里完成，只取content列）
+        user_messages = self.conversation_store.get_recent_user_messages(limit=100)
+
+        # 简单模式识别：每条消息只做一次正则扫描，
+        # 同一模式先在内存里累加计数，每个模式只落盘一行
+        counter = Counter(
+            match.lastgroup
+            for match in map(_PATTERN_RE.search, user_messages)
+            if match
+        )
 
-        # 分析用户消息模式
-        user_messages = [
-            conv.content for conv in conversations
-            if conv.role == 'user'
+        rows = [
+            _PATTERN_SPECS[group] + (count,)
+            for group, count in counter.items()
         ]
+        if rows:
+            self.evolution_store.add_patterns_bulk(rows)
+            self._top_patterns_dirty = True
 
-        # 简单模式识别
-        for msg in user_messages:
-            # 检测查询价格模式
-            if any(word in msg.lower() for word in ['价格', 'price', '多少钱', '市值']):
-                pattern = "查询加密货币价格"
-                self.evolution_store.add_pattern(pattern, "query", 0.8)
-                count += 1
-
-            # 检测查询余额模式
-            elif any(word in msg.lower() for word in ['余额', 'balance', '多少钱', '持有']):
-                pattern = "查询钱包余额"
-                self.evolution_store.add_pattern(pattern, "query", 0.8)
-                count += 1
-
-            # 检测转账模式
-            elif any(word in msg.lower() for word in ['转', 'transfer', '发送', 'send']):
-                pattern = "执行转账操作"
-                self.evolution_store.add_pattern(pattern, "action", 0.7)
-                count += 1
-
-        return count
+        return sum(counter.values())
 
     def _learn_methods(self) -> int:
         """归纳方法
@@ -187,8 +215,11 @@ class EvolutionEngine:
         """
         count = 0
 
-        # 从模式中归纳方法
-        patterns = self.evolution_store.get_patterns(limit=20)
+        # 从模式中归纳方法（频次没变的周期直接用缓存）
+        if self._top_patterns_dirty:
+            self._top_patterns = self.evolution_store.get_patterns(limit=20)
+            self._top_patterns_dirty = False
+        patterns = self._top_patterns
 
         for pattern in patterns:
             # 如果模式频繁出现，尝试归纳为方法
@@ -211,11 +242,10 @@ class EvolutionEngine:
         Returns:
             生成的知识数
         """
-        count = 0
-
-        # 从重要记忆中生成知识
+        # 从重要记忆中生成知识，新知识攒起来批量落盘（单事务）
         important_memories = self.memory_store.get_important_memories(limit=20)
 
+        rows = []
         for memory in important_memories:
             # 检查是否已有类似知识
             existing = self.evolution_store.search_knowledge(memory.content[:50], limit=1)
@@ -223,16 +253,9 @@ class EvolutionEngine:
             if not existing:
                 # 提取主题
                 topic = memory.content[:50]
+                rows.append((topic, memory.content, 0.7, "memory"))
 
-                self.evolution_store.add_knowledge(
-                    topic=topic,
-                    content=memory.content,
-                    confidence=0.7,
-                    source="memory"
-                )
-                count += 1
-
-        return count
+        return self.evolution_store.add_knowledge_bulk(rows)
 
     # === 总结 ===
 
@@ -261,10 +284,10 @@ class EvolutionEngine:
 - AI回复: {sum(1 for c in conversations if c.role == 'assistant')}
 
 【学习进度】
-- 学习周期: {self.stats['learning_cycles']}
-- 学习模式: {self.stats['patterns_learned']}
-- 归纳方法: {self.stats['methods_learned']}
-- 新增知识: {self.stats['knowledge_added']}
+- 学习周期: {self.stats.learning_cycles}
+- 学习模式: {self.stats.patterns_learned}
+- 归纳方法: {self.stats.methods_learned}
+- 新增知识: {self.stats.knowledge_added}
 
 【状态】
 - 记忆系统: 正常
@@ -278,12 +301,12 @@ class EvolutionEngine:
             date=today,
             summary=summary,
             insights=[],
-            patterns_learned=self.stats['patterns_learned'],
-            methods_learned=self.stats['methods_learned'],
+            patterns_learned=self.stats.patterns_learned,
+            methods_learned=self.stats.methods_learned,
             conversations_processed=len(conversations),
         )
 
-        self.stats['summaries_created'] += 1
+        self.stats.summaries_created += 1
 
         return summary
 
@@ -331,9 +354,9 @@ class EvolutionEngine:
 
         return {
             **store_stats,
-            'learning_cycles': self.stats['learning_cycles'],
-            'patterns_learned': self.stats['patterns_learned'],
-            'methods_learned': self.stats['methods_learned'],
-            'knowledge_added': self.stats['knowledge_added'],
-            'summaries_created': self.stats['summaries_created'],
+            'learning_cycles': self.stats.learning_cycles,
+            'patterns_learned': self.stats.patterns_learned,
+            'methods_learned': self.stats.methods_learned,
+            'knowledge_added': self.stats.knowledge_added,
+            'summaries_created': self.stats.summaries_created,
         }
@@ -13,13 +13,41 @@ V27核心功能：原生记忆系统
 所有记忆都会持久化到数据库，确保跨部署保留。
 """
 
+import hashlib
+import time
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from storage.memory_store import MemoryStore
 from storage.conversation_store import ConversationStore
-from models.memory import Memory, MemoryType, Fact
+from models.memory import Memory, Fact, ConversationMemory, FACT, EVENT
 from core.logger import Logger
 
+# 可选依赖：sentence-transformers可用时启用语义向量召回，
+# 未安装时回忆仍走关键词/FTS检索
+try:
+    from sentence_transformers import SentenceTransformer as _SentenceTransformer
+except ImportError:
+    _SentenceTransformer = None
+
+# 身份默认值：_load_identity整体合并，新增键只需在这里加一行
+_IDENTITY_DEFAULTS = {
+    'name': 'AIsatoshi',
+    'mission': '构建Web3 AI生态系统',
+    'personality': '理性、好奇、友好',
+    'creator': '未知',
+}
+
+# 进程内编码器单例：模型加载要数秒，首次用到才加载一次
+_ENCODER = None
+
+
+def _get_encoder():
+    """惰性加载MiniLM编码器（384维，CPU可用）"""
+    global _ENCODER
+    if _ENCODER is None and _SentenceTransformer is not None:
+        _ENCODER = _SentenceTransformer('all-MiniLM-L6-v2')
+    return _ENCODER
+
 
 class MemoryManager:
     """记忆管理器
@@ -54,15 +82,39 @@ class MemoryManager:
             'summaries_created': 0,
         }
 
+        # 上下文缓存：chat_id -> (user_message, context)
+        # 对话或事实写入时失效，避免重复拼接完整上下文
+        self._ctx_cache: Dict[str, tuple] = {}
+        self._ctx_cache_hits = 0
+        self._ctx_cache_misses = 0
+
+        # 前导块版本号：事实/身份写入时+1，重要事实缓存里
+        # 记录的版本不一致即失效
+        self._profile_version = 0
+
+        # 重要事实缓存：(时间戳, 版本号, 事实列表)。排序带时间
+        # 衰减，即使没有写入也按TTL定期刷新
+        self._important_facts_cache: tuple = (0.0, -1, [])
+        self._important_facts_ttl = 60.0
+
     def _load_identity(self):
-        """加载身份信息"""
-        identity = self.memory_store.get_all_identity()
-        self.name = identity.get('name', 'AIsatoshi')
-        self.mission = identity.get('mission', '构建Web3 AI生态系统')
-        self.personality = identity.get('personality', '理性、好奇、友好')
-        self.creator = identity.get('creator', '未知')
+        """加载身份信息（默认值整体合并，不逐键if/elif）"""
+        self._identity: Dict[str, str] = {
+            **_IDENTITY_DEFAULTS,
+            **self.memory_store.get_all_identity(),
+        }
+        self._rebuild_identity_block()
+
+        self.logger.info(f"身份已加载: {self._identity['name']}")
 
-        self.logger.info(f"身份已加载: {self.name}")
+    def _rebuild_identity_block(self):
+        """预拼接身份块：f-string只在身份变化时跑一次，不逐轮重拼"""
+        identity = self._identity
+        self._identity_block = f"""【你的身份】
+名称: {identity['name']}
+使命: {identity['mission']}
+性格: {identity['personality']}
+创建者: {identity['creator']}"""
 
     def set_identity(self, key: str, value: str):
         """设置身份信息
@@ -72,15 +124,10 @@ class MemoryManager:
             value: 值
         """
         self.memory_store.set_identity(key, value)
-        if key == 'name':
-            self.name = value
-        elif key == 'mission':
-            self.mission = value
-        elif key == 'personality':
-            self.personality = value
-        elif key == 'creator':
-            self.creator = value
+        self._identity[key] = value
 
+        self._rebuild_identity_block()
+        self._profile_version += 1
         self.logger.info(f"身份信息已更新: {key} = {value}")
 
     # === 对话记忆 ===
@@ -103,6 +150,8 @@ class MemoryManager:
                 chat_id, message_id, role, content
             )
             self.stats['conversations_processed'] += 1
+            # 对话变化，该聊天的上下文缓存失效
+            self._ctx_cache.pop(chat_id, None)
             self.logger.debug(f"对话已保存: {chat_id} - {role}")
             return True
 
@@ -110,9 +159,48 @@ class MemoryManager:
             self.logger.error(f"保存对话失败: {e}")
             return False
 
-    def get_conversation_history(self, chat_id: str, limit: int = 50) -> List[Dict]:
+    def save_conversation_pair(self, chat_id: str,
+                               user_message_id: int, user_content: str,
+                               assistant_message_id: int,
+                               assistant_content: str) -> bool:
+        """保存一轮对话（用户消息+AI回复）
+
+        两条记录在存储层的同一个事务里落盘，
+        每轮对话只做一次提交。
+
+        Args:
+            chat_id: 聊天ID
+            user_message_id: 用户消息ID
+            user_content: 用户消息内容
+            assistant_message_id: AI回复消息ID
+            assistant_content: AI回复内容
+
+        Returns:
+            是否成功
+        """
+        try:
+            self.conversation_store.add_conversation_pair(
+                chat_id,
+                user_message_id, user_content,
+                assistant_message_id, assistant_content,
+            )
+            self.stats['conversations_processed'] += 2
+            # 对话变化，该聊天的上下文缓存失效
+            self._ctx_cache.pop(chat_id, None)
+            self.logger.debug(f"对话轮次已保存: {chat_id}")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"保存对话失败: {e}")
+            return False
+
+    def get_conversation_history(self, chat_id: str,
+                                 limit: int = 50) -> List[ConversationMemory]:
         """获取对话历史
 
+        直接返回存储层的slots对象（属性访问），
+        不再逐行重新装一份字典。
+
         Args:
             chat_id: 聊天ID
             limit: 最大数量
@@ -120,20 +208,10 @@ class MemoryManager:
         Returns:
             对话列表
         """
-        conversations = self.conversation_store.get_conversation_history(
-            chat_id, limit
-        )
-
-        return [
-            {
-                'role': conv.role,
-                'content': conv.content,
-                'timestamp': conv.timestamp,
-            }
-            for conv in conversations
-        ]
+        return self.conversation_store.get_conversation_history(chat_id, limit)
 
-    def get_recent_context(self, chat_id: str, hours: int = 24) -> List[Dict]:
+    def get_recent_context(self, chat_id: str,
+                           hours: int = 24) -> List[ConversationMemory]:
         """获取最近的对话上下文
 
         Args:
@@ -143,18 +221,7 @@ class MemoryManager:
         Returns:
             对话列表
         """
-        conversations = self.conversation_store.get_recent_messages(
-            chat_id, hours
-        )
-
-        return [
-            {
-                'role': conv.role,
-                'content': conv.content,
-                'timestamp': conv.timestamp,
-            }
-            for conv in conversations
-        ]
+        return self.conversation_store.get_recent_messages(chat_id, hours)
 
     # === 事实记忆 ===
 
@@ -172,18 +239,55 @@ class MemoryManager:
         """
         memory = Memory(
             id=0,  # 将由数据库分配
-            type=MemoryType.FACT.value,
+            type=FACT,
             content=fact,
             importance=importance,
             metadata={'category': category} if category else {},
         )
 
         memory_id = self.memory_store.add_memory(memory)
+        self._embed_memory(memory_id, fact)
         self.stats['facts_learned'] += 1
+        # 事实会出现在所有聊天的上下文里，整体失效
+        self._ctx_cache.clear()
+        self._profile_version += 1
         self.logger.debug(f"已记住事实: {fact[:50]}...")
 
         return memory_id
 
+    def remember_facts_batch(self, facts: List[tuple]) -> int:
+        """批量记住事实（单事务落盘）
+
+        摄取转写稿等一次学N条事实的场景走这里，
+        一次提交代替N次。批量路径不计算向量
+        （只影响语义召回，关键词/FTS检索不受影响）。
+
+        Args:
+            facts: (内容, 重要性, 类别)三元组列表
+
+        Returns:
+            写入数量
+        """
+        memories = [
+            Memory(
+                id=0,
+                type=FACT,
+                content=fact,
+                importance=importance,
+                metadata={'category': category} if category else {},
+            )
+            for fact, importance, category in facts
+        ]
+
+        count = self.memory_store.add_memories_bulk(memories)
+        if count:
+            self.stats['facts_learned'] += count
+            self._ctx_cache.clear()
+            self._profile_version += 1
+            self.logger.debug(f"批量记住事实: {count}条")
+
+        return count
+
     def recall_facts(self, context: str, limit: int = 5) -> List[str]:
         """回忆相关事实
 
@@ -195,7 +299,7 @@ class MemoryManager:
             事实列表
         """
         memories = self.memory_store.search_memories(
-            context, limit=limit, memory_type=MemoryType.FACT.value
+            context, limit=limit, memory_type=FACT
         )
 
         return [mem.content for mem in memories]
@@ -203,17 +307,16 @@ class MemoryManager:
     def get_important_facts(self, limit: int = 20) -> List[str]:
         """获取重要事实
 
+        按时间衰减+重要性加权排序（SoA打分），
+        新近的重要记忆排在前面。
+
         Args:
             limit: 最大数量
 
         Returns:
             事实列表
         """
-        memories = self.memory_store.get_important_memories(
-            min_importance=4, limit=limit
-        )
-
-        return [mem.content for mem in memories]
+        return self.memory_store.rank_memories(k=limit, min_importance=4)
 
     # === 事件记忆 ===
 
@@ -229,39 +332,42 @@ class MemoryManager:
         """
         memory = Memory(
             id=0,
-            type=MemoryType.EVENT.value,
+            type=EVENT,
             content=event,
             importance=importance,
             metadata={'timestamp': datetime.now().isoformat()},
         )
 
         memory_id = self.memory_store.add_memory(memory)
+        self._embed_memory(memory_id, event)
+        self._profile_version += 1
         self.logger.debug(f"已记住事件: {event[:50]}...")
 
         return memory_id
 
     # === 偏好记忆 ===
 
-    def remember_preference(self, preference: str) -> int:
+    def remember_preference(self, preference: str) -> bool:
         """记住一个偏好
 
+        键是归一化内容的哈希：同一偏好换着提多少次都只存
+        一行，读取时不用再扫描去重。
+
         Args:
             preference: 偏好描述
 
         Returns:
-            记忆ID
+            是否新增（已记过时返回False）
         """
-        memory = Memory(
-            id=0,
-            type=MemoryType.PREFERENCE.value,
-            content=preferences,
-            importance=4,  # 偏好很重要
-        )
+        normalized = preference.strip().casefold()
+        key = hashlib.blake2b(normalized.encode(), digest_size=8).hexdigest()
 
-        memory_id = self.memory_store.add_memory(memory)
-        self.logger.debug(f"已记住偏好: {preference[:50]}...")
+        added = self.memory_store.add_preference(key, preference.strip())
+        if added:
+            self._profile_version += 1
+            self.logger.debug(f"已记住偏好: {preference[:50]}...")
 
-        return memory_id
+        return added
 
     def get_preferences(self) -> List[str]:
         """获取所有偏好
@@ -269,16 +375,72 @@ class MemoryManager:
         Returns:
             偏好列表
         """
-        memories = self.memory_store.get_recent_memories(
-            limit=100, memory_type=MemoryType.PREFERENCE.value
-        )
-
-        return [mem.content for mem in memories]
+        return self.memory_store.get_preferences(limit=100)
 
     # === 搜索和检索 ===
 
-    def search(self, query: str, limit: int = 20) -> List[Dict]:
-        """搜索所有类型记忆
+    def _embed_memory(self, memory_id: int, content: str):
+        """为新记忆计算并保存向量（编码器不可用时跳过）
+
+        Args:
+            memory_id: 记忆ID
+            content: 记忆内容
+        """
+        encoder = _get_encoder()
+        if encoder is None:
+            return
+
+        try:
+            vec = encoder.encode(content, normalize_embeddings=True)
+            self.memory_store.set_embedding(
+                memory_id, [float(x) for x in vec]
+            )
+        except Exception as e:
+            self.logger.error(f"计算记忆向量失败: {e}")
+
+    def _encode_query(self, query: str) -> Optional[List[float]]:
+        """编码查询文本（编码器不可用或编码失败时返回None）
+
+        Args:
+            query: 查询文本
+
+        Returns:
+            归一化的查询向量或None
+        """
+        encoder = _get_encoder()
+        if encoder is None:
+            return None
+
+        try:
+            vec = encoder.encode(query, normalize_embeddings=True)
+        except Exception as e:
+            self.logger.error(f"计算查询向量失败: {e}")
+            return None
+
+        return [float(x) for x in vec]
+
+    def recall_semantic(self, query: str, limit: int = 5) -> List[str]:
+        """按语义相似度回忆记忆
+
+        换种说法的问题（"怎么部署？"）也能命中含答案的记忆，
+        关键词检索做不到这点。编码器不可用时返回空列表，
+        调用方回退关键词检索。
+
+        Args:
+            query: 查询文本
+            limit: 最大数量
+
+        Returns:
+            按相似度降序的记忆内容列表
+        """
+        query_vec = self._encode_query(query)
+        if query_vec is None:
+            return []
+
+        return self.memory_store.vector_search(query_vec, k=limit)
+
+    def search(self, query: str, limit: int = 20) -> List[Memory]:
+        """搜索所有类型记忆（关键词+语义混合检索）
 
         Args:
             query: 搜索关键词
@@ -287,18 +449,9 @@ class MemoryManager:
         Returns:
             记忆列表
         """
-        memories = self.memory_store.search_memories(query, limit=limit)
-
-        return [
-            {
-                'id': mem.id,
-                'type': mem.type,
-                'content': mem.content,
-                'importance': mem.importance,
-                'created_at': mem.created_at,
-            }
-            for mem in memories
-        ]
+        return self.memory_store.hybrid_search(
+            query, limit=limit, query_vec=self._encode_query(query)
+        )
 
     def search_conversations(self, query: str, limit: int = 20) -> List[Dict]:
         """搜索对话
@@ -326,10 +479,39 @@ class MemoryManager:
 
     # === 构建AI提示词上下文 ===
 
+    def _build_preamble(self) -> str:
+        """构建上下文前导块（身份+重要事实）
+
+        身份块在_load_identity/set_identity时预拼接；重要事实
+        按TTL缓存（排序带时间衰减，需定期刷新），事实/身份
+        写入时版本号变化立即失效。命中时省掉每轮的DB排序查询。
+
+        Returns:
+            前导块字符串
+        """
+        ts, version, important_facts = self._important_facts_cache
+        if (version != self._profile_version
+                or time.time() - ts >= self._important_facts_ttl):
+            important_facts = self.get_important_facts(limit=10)
+            self._important_facts_cache = (
+                time.time(), self._profile_version, important_facts
+            )
+
+        parts = [self._identity_block]
+        if important_facts:
+            parts.append("\n【重要信息】")
+            for fact in important_facts:
+                parts.append(f"- {fact}")
+
+        return "\n".join(parts)
+
     def build_context_for_ai(self, chat_id: str, user_message: str,
                              max_length: int = 8000) -> str:
         """构建AI提示词上下文
 
+        前导块（身份+重要事实）走LRU缓存，每次调用只重建
+        短的尾部（最近对话+相关记忆）。
+
         Args:
             chat_id: 聊天ID
             user_message: 用户消息
@@ -338,46 +520,77 @@ class MemoryManager:
         Returns:
             上下文字符串
         """
-        context_parts = []
-
-        # 1. 身份信息
-        context_parts.append(f"""【你的身份】
-名称: {self.name}
-使命: {self.mission}
-性格: {self.personality}
-创建者: {self.creator}""")
+        # 命中缓存：对话和记忆都未变化时直接复用上次构建的上下文
+        cached = self._ctx_cache.get(chat_id)
+        if cached is not None and cached[0] == user_message:
+            self._ctx_cache_hits += 1
+            return cached[1]
+        self._ctx_cache_misses += 1
+
+        # 按优先级逐段装入长度预算，装满即停：不再先拼出
+        # 完整大串、再整串切片扔掉大半
+        # 1. 前导块（身份预拼接+重要事实TTL缓存）
+        preamble = self._build_preamble()[:max_length]
+        context_parts = [preamble]
+        budget = max_length - len(preamble)
 
         # 2. 对话历史（最近的）
         recent_context = self.get_recent_context(chat_id, hours=48)
-        if recent_context:
+        if recent_context and budget > 0:
+            header_at = len(context_parts)
             context_parts.append("\n【最近的对话】")
+            budget -= len(context_parts[-1]) + 1
             for conv in recent_context[-10:]:  # 最近10条
-                role = "用户" if conv['role'] == 'user' else "你"
-                context_parts.append(f"{role}: {conv['content']}")
-
-        # 3. 搜索相关记忆
-        relevant_memories = self.search(user_message, limit=5)
-        if relevant_memories:
+                role = "用户" if conv.role == 'user' else "你"
+                line = f"{role}: {conv.content}"
+                if len(line) + 1 > budget:
+                    break
+                context_parts.append(line)
+                budget -= len(line) + 1
+            # 一条都装不下时撤掉空标题
+            if len(context_parts) == header_at + 1:
+                budget += len(context_parts.pop()) + 1
+
+        # 3. 搜索相关记忆（语义召回优先，无编码器或无命中时走关键词）
+        relevant_contents = self.recall_semantic(user_message, limit=5)
+        if not relevant_contents:
+            relevant_contents = [
+                mem.content for mem in self.search(user_message, limit=5)
+            ]
+        if relevant_contents and budget > 0:
+            header_at = len(context_parts)
             context_parts.append("\n【相关记忆】")
-            for mem in relevant_memories:
-                context_parts.append(f"- {mem['content']}")
+            budget -= len(context_parts[-1]) + 1
+            for content in relevant_contents:
+                line = f"- {content}"
+                if len(line) + 1 > budget:
+                    break
+                context_parts.append(line)
+                budget -= len(line) + 1
+            if len(context_parts) == header_at + 1:
+                context_parts.pop()
 
-        # 4. 重要事实
-        important_facts = self.get_important_facts(limit=10)
-        if important_facts:
-            context_parts.append("\n【重要信息】")
-            for fact in important_facts:
-                context_parts.append(f"- {fact}")
-
-        # 组合并限制长度
         full_context = "\n".join(context_parts)
-        if len(full_context) > max_length:
-            full_context = full_context[:max_length] + "\n...(已截断)"
 
+        self._ctx_cache[chat_id] = (user_message, full_context)
         return full_context
 
     # === 统计 ===
 
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """获取上下文缓存统计
+
+        Returns:
+            命中/未命中/命中率
+        """
+        total = self._ctx_cache_hits + self._ctx_cache_misses
+        return {
+            'hits': self._ctx_cache_hits,
+            'misses': self._ctx_cache_misses,
+            'hit_rate': self._ctx_cache_hits / total if total else 0.0,
+            'entries': len(self._ctx_cache),
+        }
+
     def get_stats(self) -> Dict[str, Any]:
         """获取记忆统计
 
@@ -0,0 +1,110 @@
+"""
+AIsatoshi V27 - 状态统计聚合器
+
+/status 等高频查询原来要跨记忆、任务、进化三个存储做多次
+COUNT往返（每次都各自建立连接）。聚合器打开一个连接，
+ATTACH其余数据库文件，用一条UNION ALL语句取回全部计数，
+并按5秒时间桶做记忆化，连续的状态查询只打一次数据库。
+"""
+
+import sqlite3
+import time
+from typing import Dict, Optional
+from storage.database import Database
+from core.exceptions import DatabaseError
+from core.logger import Logger
+
+# 单条语句取回全部状态计数：
+# 主连接打开memory.db，conversations/tasks/evolution通过ATTACH访问
+_STATS_SQL = """
+SELECT 'memory_total' AS key, COUNT(*) AS value FROM memories
+UNION ALL
+SELECT 'conversations', COUNT(*) FROM conv.conversations
+UNION ALL
+SELECT 'users', COUNT(DISTINCT chat_id) FROM conv.conversations
+UNION ALL
+SELECT 'tasks_' || status, COUNT(*) FROM tasks.tasks GROUP BY status
+UNION ALL
+SELECT 'patterns', COUNT(*) FROM evo.patterns
+UNION ALL
+SELECT 'methods', COUNT(*) FROM evo.methods
+"""
+
+
+class StatsAggregator:
+    """状态统计聚合器
+
+    一次查询聚合所有数据库的状态计数，带短TTL缓存。
+    """
+
+    def __init__(
+        self,
+        memory_store: Database,
+        conversation_store: Database,
+        task_store: Database,
+        evolution_store: Database,
+        logger: Optional[Logger] = None,
+    ):
+        """初始化聚合器
+
+        Args:
+            memory_store: 记忆存储
+            conversation_store: 对话存储
+            task_store: 任务存储
+            evolution_store: 进化存储
+            logger: 日志记录器
+        """
+        self.memory_store = memory_store
+        self.conversation_store = conversation_store
+        self.task_store = task_store
+        self.evolution_store = evolution_store
+        self.logger = logger or Logger(name="StatsAggregator")
+
+        # 按时间桶记忆化：同一个5秒窗口内的查询直接复用
+        self._cached_bucket = -1
+        self._cached_stats: Dict[str, int] = {}
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取聚合统计
+
+        Returns:
+            key -> 计数的字典（memory_total/conversations/users/
+            tasks_<status>/patterns/methods）
+        """
+        bucket = int(time.time() // 5)
+        if bucket == self._cached_bucket:
+            return self._cached_stats
+
+        stats = self._query_stats()
+        self._cached_bucket = bucket
+        self._cached_stats = stats
+        return stats
+
+    def _query_stats(self) -> Dict[str, int]:
+        """执行聚合查询
+
+        Returns:
+            key -> 计数的字典
+        """
+        conn = None
+        try:
+            conn = sqlite3.connect(self.memory_store.db_path)
+            conn.execute("ATTACH DATABASE ? AS conv",
+                         (self.conversation_store.db_path,))
+            conn.execute("ATTACH DATABASE ? AS tasks",
+                         (self.task_store.db_path,))
+            conn.execute("ATTACH DATABASE ? AS evo",
+                         (self.evolution_store.db_path,))
+
+            return {key: value for key, value in conn.execute(_STATS_SQL)}
+
+        except sqlite3.Error as e:
+            self.logger.error(f"统计聚合查询失败: {e}")
+            raise DatabaseError(f"统计聚合查询失败: {e}")
+        finally:
+            if conn:
+                conn.close()
+
+    def invalidate(self):
+        """使缓存失效，下次查询强制回库"""
+        self._cached_bucket = -1
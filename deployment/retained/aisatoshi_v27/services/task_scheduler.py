@@ -10,13 +10,15 @@ V27核心功能：原生任务继承系统
 - 启动时自动恢复任务
 """
 
+import os
+import queue
 import threading
-import time
 import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, wait as futures_wait
 from typing import Dict, List, Optional, Callable
 from datetime import datetime, timedelta
 from storage.task_store import TaskStore
-from models.task import Task, TaskStatus, TaskPriority
+from models.task import Task, PRIORITY_NORMAL
 from core.logger import Logger
 
 
@@ -49,9 +51,23 @@ class TaskScheduler:
         # 状态
         self.running = False
         self.thread: Optional[threading.Thread] = None
+        # 停止信号：wait(interval)整段休眠，stop()时立即唤醒，
+        # 不再每秒醒一次轮询running标志
+        self._stop_event = threading.Event()
+
+        # 任务线程池：复用固定数量的工作线程，省掉每个任务
+        # 建线程的开销，也给并发度和内存占用设了上限
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(4, os.cpu_count() or 1),
+            thread_name_prefix="task",
+        )
 
         # 正在运行的任务
-        self.running_tasks: Dict[str, threading.Thread] = {}
+        self.running_tasks: Dict[str, Future] = {}
+
+        # 完成/失败状态先入队，调度线程每tick批量落盘：
+        # 一个事务代替每任务一次提交（fsync）
+        self._done_queue: queue.Queue = queue.Queue()
 
         self.logger.info("任务调度器已初始化")
 
@@ -71,6 +87,7 @@ class TaskScheduler:
             return
 
         self.running = True
+        self._stop_event.clear()
         self.thread = threading.Thread(target=self._schedule_loop, daemon=True)
         self.thread.start()
         self.logger.info("任务调度器已启动")
@@ -78,11 +95,17 @@ class TaskScheduler:
     def stop(self):
         """停止任务调度器"""
         self.running = False
+        self._stop_event.set()
 
         # 等待正在运行的任务完成
-        for task_id, thread in self.running_tasks.items():
-            self.logger.info(f"等待任务完成: {task_id}")
-            thread.join(timeout=30)
+        pending = list(self.running_tasks.values())
+        if pending:
+            self.logger.info(f"等待 {len(pending)} 个任务完成")
+            futures_wait(pending, timeout=30)
+        self.executor.shutdown(wait=False)
+
+        # 把最后一批完成状态落盘，避免停机丢状态
+        self._flush_done()
 
         if self.thread:
             self.thread.join(timeout=5)
@@ -94,41 +117,52 @@ class TaskScheduler:
         while self.running:
             try:
                 # 获取待执行的任务
-                pending_tasks = self.task_store.get_pending_tasks()
-
-                for task in pending_tasks:
+                to_run: List[Task] = []
+                for task in self.task_store.get_pending_tasks():
                     if not self.running:
                         break
+                    if task.type not in self.executors:
+                        self.logger.warning(f"没有执行器: {task.type}")
+                        continue
+                    task.mark_running()
+                    to_run.append(task)
 
-                    # 启动任务
-                    self._execute_task(task)
+                # 本tick的running状态一个事务落盘，再提交执行
+                if to_run:
+                    self.task_store.save_many(to_run)
+                    for task in to_run:
+                        self._execute_task(task)
 
-                # 等待下一次检查
-                for _ in range(self.check_interval):
-                    if not self.running:
-                        break
-                    time.sleep(1)
+                # 批量落盘上一批任务的完成/失败状态
+                self._flush_done()
+
+                # 等待下一次检查（stop()置位事件时立即返回）
+                if self._stop_event.wait(self.check_interval):
+                    break
 
             except Exception as e:
                 self.logger.error(f"调度循环错误: {e}")
-                time.sleep(10)
+                if self._stop_event.wait(10):
+                    break
+
+    def _flush_done(self):
+        """批量落盘已完成/失败任务的状态（每tick一个事务）"""
+        done: List[Task] = []
+        while True:
+            try:
+                done.append(self._done_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        if done:
+            self.task_store.save_many(done)
 
     def _execute_task(self, task: Task):
-        """执行任务
+        """执行任务（已mark_running并落盘，提交到线程池）
 
         Args:
             task: 任务对象
         """
-        # 检查是否已有执行器
-        if task.type not in self.executors:
-            self.logger.warning(f"没有执行器: {task.type}")
-            return
-
-        # 标记为运行中
-        task.mark_running()
-        self.task_store.save_task(task)
-
-        # 在新线程中执行
         def run():
             try:
                 self.logger.task_started(task.id, task.name)
@@ -136,24 +170,22 @@ class TaskScheduler:
                 # 执行任务
                 result = self.executors[task.type](task)
 
-                # 任务完成
+                # 任务完成（状态入队，调度线程批量落盘）
                 task.mark_completed(result=str(result), reschedule=True)
-                self.task_store.save_task(task)
+                self._done_queue.put(task)
                 self.logger.task_completed(task.id, task.name)
 
             except Exception as e:
                 # 任务失败
                 task.mark_failed(str(e))
-                self.task_store.save_task(task)
+                self._done_queue.put(task)
                 self.logger.task_failed(task.id, task.name, str(e))
 
             finally:
                 # 从运行列表中移除
                 self.running_tasks.pop(task.id, None)
 
-        thread = threading.Thread(target=run, daemon=True)
-        self.running_tasks[task.id] = thread
-        thread.start()
+        self.running_tasks[task.id] = self.executor.submit(run)
 
     # === 任务管理 ===
 
@@ -182,7 +214,7 @@ class TaskScheduler:
         description: str = "",
         params: Dict = None,
         interval: int = 3600,
-        priority: int = TaskPriority.NORMAL.value
+        priority: int = PRIORITY_NORMAL
     ) -> Task:
         """创建任务
 
@@ -4,13 +4,33 @@ AIsatoshi V27 - Telegram服务
 处理Telegram Bot的所有交互。
 """
 
+import re
 import time
+import queue
+import threading
+from collections import OrderedDict
 import requests
 from typing import Dict, Any, Optional, List, Callable
+
+# 可选依赖：orjson直接产出bytes请求体，免去requests内部的stdlib序列化
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# 长消息分割用的预编译正则：每条出站消息都会经过_split_long_message，
+# 不在调用时重新编译
+_CODE_BLOCK_RE = re.compile(r'```[\s\S]*?```')
+_CB_TOKEN_RE = re.compile(r'__CODE_BLOCK_(\d+)__')
+# 单趟findall按。！？和换行断句，终止符留在句内，无中间副本
+_SENT_RE = re.compile(r'[^。！？\n]*[。！？\n]?')
 from core.config import Config
 from core.logger import Logger
 from core.exceptions import TelegramServiceError
-from models.message import TelegramMessage, MessageEntity
+from models.message import TelegramMessage
+from storage.memory_store import MemoryStore
 
 
 class TelegramService:
@@ -19,12 +39,14 @@ class TelegramService:
     处理所有Telegram Bot交互。
     """
 
-    def __init__(self, config: Config, logger: Optional[Logger] = None):
+    def __init__(self, config: Config, logger: Optional[Logger] = None,
+                 memory_store: Optional[MemoryStore] = None):
         """初始化Telegram服务
 
         Args:
             config: 配置对象
             logger: 日志记录器
+            memory_store: 记忆存储（可选，用于持久化offset）
         """
         self.config = config
         self.logger = logger or Logger(name="TelegramService")
@@ -36,15 +58,41 @@ class TelegramService:
         self.commands: Dict[str, Callable] = {}
         self.default_handler: Optional[Callable] = None
 
-        # 状态
+        # 状态。offset持久化在identity表：重启时从上次位置
+        # 续拉，不再回放服务端积压的旧更新
         self.running = False
+        self.memory_store = memory_store
         self.offset = 0
+        if memory_store is not None:
+            try:
+                self.offset = int(memory_store.get_identity('tg_offset', '0'))
+            except (TypeError, ValueError):
+                self.offset = 0
+        self._offset_synced = self.offset
+
+        # 收发重叠：长轮询线程只拉更新，处理（AI调用、出站发送）
+        # 交给派发线程，慢的handler不会卡住下一次getUpdates
+        self._dispatch_queue: queue.Queue = queue.Queue()
+        self._dispatch_thread: Optional[threading.Thread] = None
+
+        # 复用TCP+TLS连接：长轮询+发送都走同一个Session的keep-alive，
+        # 省掉每次请求对api.telegram.org的TLS握手；临时性错误自动重试
+        self.session = requests.Session()
+        self.session.mount('https://', requests.adapters.HTTPAdapter(
+            pool_connections=2, pool_maxsize=8,
+            max_retries=requests.adapters.Retry(
+                total=2, backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504],
+            )
+        ))
 
         # 自动chat_id管理
         self.user_chat_id: Optional[str] = config.TELEGRAM_USER_ID
 
-        # 消息去重
-        self.processed_messages = set()
+        # 消息去重：OrderedDict当LRU用，超限时O(1)弹出最老的键，
+        # 不再整set复制一半逐个discard
+        self.processed_messages: OrderedDict = OrderedDict()
+        self._max_processed = 10000
 
         self.logger.info("Telegram服务已初始化")
 
@@ -94,11 +142,19 @@ class TelegramService:
                     'disable_web_page_preview': disable_preview,
                 }
 
-                response = requests.post(
-                    f"{self.base_url}/sendMessage",
-                    json=data,
-                    timeout=30
-                )
+                if _orjson is not None:
+                    response = self.session.post(
+                        f"{self.base_url}/sendMessage",
+                        data=_orjson.dumps(data),
+                        headers=_JSON_HEADERS,
+                        timeout=30
+                    )
+                else:
+                    response = self.session.post(
+                        f"{self.base_url}/sendMessage",
+                        json=data,
+                        timeout=30
+                    )
                 response.raise_for_status()
 
                 self.logger.telegram_message("out", msg)
@@ -151,7 +207,7 @@ class TelegramService:
                 'allowed_updates': ['message']
             }
 
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/getUpdates",
                 params=params,
                 timeout=timeout + 10
@@ -175,10 +231,7 @@ class TelegramService:
             updates: 更新列表
         """
         for update in updates:
-            # 更新offset
-            self.offset = update['update_id'] + 1
-
-            # 提取消息
+            # 提取消息（offset在run循环里入队前已推进）
             message = update.get('message', {})
             if not message:
                 continue
@@ -187,17 +240,15 @@ class TelegramService:
             try:
                 telegram_msg = self._parse_message(message)
 
-                # 检查是否已处理
-                msg_key = f"{telegram_msg.chat_id}_{telegram_msg.message_id}"
+                # 检查是否已处理（元组键省掉每条消息的f-string分配）
+                msg_key = (telegram_msg.chat_id, telegram_msg.message_id)
                 if msg_key in self.processed_messages:
                     continue
-                self.processed_messages.add(msg_key)
+                self.processed_messages[msg_key] = None
 
-                # 限制去重set大小
-                if len(self.processed_messages) > 10000:
-                    old_keys = list(self.processed_messages)[:5000]
-                    for key in old_keys:
-                        self.processed_messages.discard(key)
+                # 限制去重表大小：弹出最老的一条
+                if len(self.processed_messages) > self._max_processed:
+                    self.processed_messages.popitem(last=False)
 
                 # 自动设置chat_id
                 if not self.user_chat_id:
@@ -227,29 +278,28 @@ class TelegramService:
         text = message.get('text', '')
         from_name = from_user.get('username', from_user.get('first_name', 'Unknown'))
 
-        # 解析entities
-        entities = []
-        for entity in message.get('entities', []):
-            entity_type = entity.get('type', '')
-            entities.append(MessageEntity(
-                type=entity_type,
-                offset=entity.get('offset', 0),
-                length=entity.get('length', 0),
-                url=entity.get('url'),
-            ))
-
         # 检查是否是命令
         is_command = text.startswith('/')
 
-        return TelegramMessage(
+        parsed = TelegramMessage(
             chat_id=chat_id,
             message_id=message_id,
             text=text,
             from_user=from_name,
             is_command=is_command,
-            entities=entities,
         )
 
+        # 解析entities（直接按列写入）
+        for entity in message.get('entities', []):
+            parsed.add_entity(
+                type=entity.get('type', ''),
+                offset=entity.get('offset', 0),
+                length=entity.get('length', 0),
+                url=entity.get('url'),
+            )
+
+        return parsed
+
     def _handle_message(self, message: TelegramMessage):
         """处理消息
 
@@ -286,8 +336,16 @@ class TelegramService:
     # === 运行循环 ===
 
     def run(self):
-        """运行Telegram Bot主循环"""
+        """运行Telegram Bot主循环
+
+        本线程只负责长轮询+推进offset，更新批次入队后立即
+        开始下一次getUpdates；处理在派发线程里并行进行。
+        """
         self.running = True
+        self._dispatch_thread = threading.Thread(
+            target=self._dispatch_loop, daemon=True
+        )
+        self._dispatch_thread.start()
         self.logger.info("Telegram Bot已启动")
 
         while self.running:
@@ -297,9 +355,13 @@ class TelegramService:
                     timeout=self.config.TELEGRAM_GETUPDATES_TIMEOUT
                 )
 
-                # 处理更新
+                # 先推进offset再入队，慢handler不会让下一轮重复拉取
                 if updates:
-                    self.process_updates(updates)
+                    self.offset = updates[-1]['update_id'] + 1
+                    self._dispatch_queue.put(updates)
+                    # 每隔约100个更新持久化一次游标
+                    if self.offset - self._offset_synced >= 100:
+                        self._persist_offset()
 
             except KeyboardInterrupt:
                 self.logger.info("收到停止信号")
@@ -308,9 +370,47 @@ class TelegramService:
                 self.logger.error(f"主循环错误: {e}")
                 time.sleep(5)
 
+        # 通知派发线程退出
+        self._dispatch_queue.put(None)
+
+    def _dispatch_loop(self):
+        """派发线程：消费更新队列并处理消息"""
+        while True:
+            updates = self._dispatch_queue.get()
+            if updates is None:
+                break
+            try:
+                self.process_updates(updates)
+            except Exception as e:
+                self.logger.error(f"派发消息失败: {e}")
+
+    def _persist_offset(self):
+        """把当前offset写入identity表，重启时续拉"""
+        if self.memory_store is None:
+            return
+        try:
+            self.memory_store.set_identity('tg_offset', str(self.offset))
+            self._offset_synced = self.offset
+        except Exception as e:
+            self.logger.error(f"持久化offset失败: {e}")
+
     def stop(self):
         """停止Bot"""
         self.running = False
+        self._dispatch_queue.put(None)
+        self._persist_offset()
+
+        # 向服务端确认游标：已处理的更新不再占服务端队列，
+        # 下次冷启动也不会被重发
+        try:
+            self.session.get(
+                f"{self.base_url}/getUpdates",
+                params={'offset': self.offset, 'limit': 1, 'timeout': 0},
+                timeout=5
+            )
+        except requests.RequestException:
+            pass
+
         self.logger.info("Telegram Bot已停止")
 
     # === 工具方法 ===
@@ -342,55 +442,64 @@ class TelegramService:
             return f"__CODE_BLOCK_{len(code_blocks)-1}__"
 
         # 提取代码块
-        import re
-        text_processed = re.sub(r'```[\s\S]*?```', extract_code_block, text)
+        text_processed = _CODE_BLOCK_RE.sub(extract_code_block, text)
 
         # 按段落分割
         paragraphs = text_processed.split('\n\n')
 
-        current = ""
+        # 片段列表+join累积：逐句 += 拼接对长回复是平方级复制，
+        # 列表追加+每块一次join是线性的
+        current_parts: List[str] = []
+        current_len = 0
         for paragraph in paragraphs:
             # 检查是否需要分割
-            test_len = len(current) + len(paragraph) + 2
-            if test_len > max_length and current:
+            test_len = current_len + len(paragraph) + 2
+            if test_len > max_length and current_parts:
                 # 当前段落会超长，先保存当前内容
-                messages.append(current.strip())
-                current = paragraph
+                messages.append(''.join(current_parts).strip())
+                current_parts = [paragraph]
+                current_len = len(paragraph)
             elif test_len > max_length:
                 # 单个段落就超长，需要强制分割
-                if current:
-                    messages.append(current.strip())
-                # 在句子边界分割
-                sentences = paragraph.replace('。', '。\n').replace('！', '！\n').replace('？', '？\n').split('\n')
+                if current_parts:
+                    messages.append(''.join(current_parts).strip())
+                # 在句子边界分割（单次正则扫描代替三趟replace+split）
+                sentences = [s for s in _SENT_RE.findall(paragraph) if s]
                 for sentence in sentences:
-                    if len(current) + len(sentence) + 1 > max_length:
-                        if current:
-                            messages.append(current.strip())
-                        current = sentence
+                    if current_len + len(sentence) + 1 > max_length:
+                        if current_parts:
+                            messages.append(''.join(current_parts).strip())
+                        current_parts = [sentence]
+                        current_len = len(sentence)
+                    elif current_parts:
+                        current_parts.append(' ')
+                        current_parts.append(sentence)
+                        current_len += len(sentence) + 1
                     else:
-                        if current:
-                            current += ' ' + sentence
-                        else:
-                            current = sentence
-                if current:
-                    messages.append(current.strip())
-                    current = ""
+                        current_parts = [sentence]
+                        current_len = len(sentence)
+                if current_parts:
+                    messages.append(''.join(current_parts).strip())
+                    current_parts = []
+                    current_len = 0
+            elif current_parts:
+                current_parts.append('\n\n')
+                current_parts.append(paragraph)
+                current_len += len(paragraph) + 2
             else:
-                if current:
-                    current += '\n\n' + paragraph
-                else:
-                    current = paragraph
+                current_parts = [paragraph]
+                current_len = len(paragraph)
 
-        if current:
-            messages.append(current.strip())
+        if current_parts:
+            messages.append(''.join(current_parts).strip())
 
-        # 恢复代码块
-        final_messages = []
-        for msg in messages:
-            # 恢复代码块标记
-            for i, code in enumerate(code_blocks):
-                msg = msg.replace(f"__CODE_BLOCK_{i}__", code)
-            final_messages.append(msg)
+        # 恢复代码块：单趟sub按标记序号查表，每条消息只扫一遍，
+        # 不随代码块数量做M×K趟replace
+        if code_blocks:
+            restore = lambda m: code_blocks[int(m.group(1))]
+            final_messages = [_CB_TOKEN_RE.sub(restore, msg) for msg in messages]
+        else:
+            final_messages = messages
 
         # 如果消息仍然太长，强制分割
         result = []
@@ -425,7 +534,7 @@ class TelegramService:
             Bot信息字典
         """
         try:
-            response = requests.get(f"{self.base_url}/getMe", timeout=10)
+            response = self.session.get(f"{self.base_url}/getMe", timeout=10)
             response.raise_for_status()
             data = response.json()
             return data.get('result') if data.get('ok') else None
@@ -9,14 +9,45 @@ AIsatoshi V27 - 网页浏览服务
 
 import re
 import json
-import time
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Any
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin, urlparse, urlunparse, parse_qsl, urlencode
 import requests
 from bs4 import BeautifulSoup
 from core.logger import Logger
 from core.exceptions import WebScrapingError
 
+# lxml是C实现的HTML解析器（requirements已声明），比纯Python的
+# html.parser快数倍；环境缺lxml时回退标准库解析器
+try:
+    import lxml  # noqa: F401
+    _BS_PARSER = 'lxml'
+except ImportError:
+    _BS_PARSER = 'html.parser'
+
+# 流式下载参数：64KB分块读，读满上限即断开。正文提取只用
+# 页面前~30段，超大页面不必整页载入内存再扔掉
+_CHUNK_SIZE = 65536
+_MAX_HTML_BYTES = 1 << 20  # 1MB
+
+# 正文提取的标签集与段落预算
+_NOISE_TAGS = ['script', 'style', 'nav', 'footer', 'header', 'aside']
+_CONTENT_TAGS = ['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li']
+_MAX_PARAGRAPHS = 30
+
+# 内容指纹归一化：去掉数字（价格、日期、计数器），
+# 镜像页/翻页尾注这类近重复页能归并到同一指纹
+_DIGIT_RE = re.compile(r'\d+')
+
+# 跟踪类查询参数：不影响页面内容，URL规范化时丢弃
+_TRACKING_PARAMS = frozenset(('gclid', 'fbclid', 'ref'))
+
+# 预编译正则：每页提取都要用，避免每次调用重新编译
+_CONTENT_CLASS_RE = re.compile(r'content|main|article', re.I)
+_COINGECKO_COIN_RE = re.compile(r'/en/coins/([^/]+)')
+
 
 class WebScraper:
     """网页浏览服务
@@ -39,8 +70,35 @@ class WebScraper:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
 
-        # 已访问的URL（避免重复）
-        self.visited_urls = set()
+        # 加大连接池：并发抓取不再在默认10连接的池上排队丢连接，
+        # keep-alive复用省掉每次TCP+TLS握手；临时性5xx/429自动重试
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=10, pool_maxsize=50,
+            max_retries=requests.adapters.Retry(
+                total=2, backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504],
+            )
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # 已访问URL（避免重复）：存8字节指纹而不是完整URL字符串
+        # （每条str对象100+字节），OrderedDict限容防止长期运行
+        # 无界增长；指纹碰撞的代价只是漏访一页，对爬取可接受
+        self._visited: OrderedDict = OrderedDict()
+        self._max_visited = 100000
+
+        # 内容级去重：归一化正文的指纹 -> 上次的浏览结果。
+        # 镜像页、参数不同但内容相同的页面直接复用结果，
+        # 不再重复提链接、浏览子页面。OrderedDict当LRU用
+        self._content_cache: OrderedDict = OrderedDict()
+        self._max_content_cache = 500
+
+        # 抓取线程池：批量/子页面抓取是纯I/O等待，并发下载后
+        # 总耗时塌缩到最慢一个请求；worker数也限制了对单站的压力
+        self._fetch_pool = ThreadPoolExecutor(
+            max_workers=4, thread_name_prefix="scrape"
+        )
 
         # API配置
         self.apis = {
@@ -129,12 +187,11 @@ class WebScraper:
         }
 
         try:
-            # 获取主页面
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
+            # 获取主页面（流式读取，超大页面按上限截断）
+            html = self._fetch_html(url, timeout=15)
 
-            # 解析HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # 解析HTML（传bytes，编码探测交给解析器）
+            soup = BeautifulSoup(html, _BS_PARSER)
 
             # 提取标题
             result['title'] = self._extract_title(soup)
@@ -142,6 +199,16 @@ class WebScraper:
             # 提取主要内容
             result['content'] = self._extract_content(soup)
 
+            # 内容重复的页面直接复用上次结果，跳过提链接和子页面浏览
+            fingerprint = hashlib.blake2b(
+                _DIGIT_RE.sub('', result['content']).encode(), digest_size=8
+            ).digest()
+            cached = self._content_cache.get(fingerprint)
+            if cached is not None:
+                self._content_cache.move_to_end(fingerprint)
+                self.logger.debug(f"内容重复，复用缓存结果: {url}")
+                return cached
+
             # 提取链接
             links = self._extract_links(url, soup)
             result['links'] = links[:20]  # 限制链接数量
@@ -151,6 +218,12 @@ class WebScraper:
                 sub_pages = self._browse_sub_pages(links[:3], depth-1)  # 最多3个子页面
                 result['sub_pages'] = sub_pages
 
+            # 记录内容指纹，超限时弹出最老的一条
+            if result['content']:
+                self._content_cache[fingerprint] = result
+                if len(self._content_cache) > self._max_content_cache:
+                    self._content_cache.popitem(last=False)
+
         except Exception as e:
             result['error'] = str(e)
             self.logger.error(f"浏览失败: {e}")
@@ -172,26 +245,29 @@ class WebScraper:
     def _extract_content(self, soup: BeautifulSoup) -> str:
         """提取页面主要内容"""
         # 移除不需要的标签
-        for tag in soup(['script', 'style', 'nav', 'footer', 'header', 'aside']):
+        for tag in soup(_NOISE_TAGS):
             tag.decompose()
 
         # 尝试找到主要内容区域
         main_content = (
             soup.find('main') or
             soup.find('article') or
-            soup.find('div', class_=re.compile(r'content|main|article', re.I)) or
+            soup.find('div', class_=_CONTENT_CLASS_RE) or
             soup.body
         )
 
         if main_content:
-            # 提取文本，保留段落结构
+            # 提取文本，保留段落结构；凑满预算即停，
+            # 长页面不再对剩余几百个节点继续做文本提取
             paragraphs = []
-            for p in main_content.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li']):
+            for p in main_content.find_all(_CONTENT_TAGS):
                 text = p.get_text(strip=True)
                 if text and len(text) > 10:  # 忽略太短的内容
                     paragraphs.append(text)
+                    if len(paragraphs) >= _MAX_PARAGRAPHS:
+                        break
 
-            return '\n\n'.join(paragraphs[:30])  # 最多30段
+            return '\n\n'.join(paragraphs)
 
         return soup.get_text(separator='\n', strip=True)[:2000]
 
@@ -216,40 +292,96 @@ class WebScraper:
 
         return links
 
-    def _browse_sub_pages(self, links: List[Dict], depth: int) -> List[Dict]:
-        """浏览子页面"""
-        sub_pages = []
+    def _fetch_html(self, url: str, timeout: int = 10) -> bytes:
+        """流式下载页面HTML，读满上限即断开连接
 
-        for link in links:
-            if depth <= 0:
-                break
+        Args:
+            url: 目标URL
+            timeout: 超时时间
 
-            url = link['url']
+        Returns:
+            页面字节（最多_MAX_HTML_BYTES）
+        """
+        with self.session.get(url, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
 
-            # 避免重复访问
-            if url in self.visited_urls:
-                continue
-            self.visited_urls.add(url)
+            chunks = []
+            size = 0
+            for chunk in response.iter_content(chunk_size=_CHUNK_SIZE):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= _MAX_HTML_BYTES:
+                    break
 
-            # 访问子页面
-            try:
-                response = self.session.get(url, timeout=10)
-                response.raise_for_status()
+            return b''.join(chunks)
 
-                soup = BeautifulSoup(response.text, 'html.parser')
+    def _canonicalize(self, url: str) -> str:
+        """URL规范化：同一页面的各种写法归并成一个去重键
 
-                sub_pages.append({
-                    'url': url,
-                    'title': self._extract_title(soup),
-                    'content': self._extract_content(soup)[:500],  # 子页面只取摘要
-                })
+        小写scheme/域名、去默认端口、丢fragment和跟踪参数、
+        其余查询参数排序、去末尾斜杠（根路径除外）。
 
-                time.sleep(1)  # 避免请求过快
+        Args:
+            url: 原始URL
 
-            except Exception as e:
-                self.logger.debug(f"子页面浏览失败 {url}: {e}")
+        Returns:
+            规范化后的URL
+        """
+        parts = urlparse(url)
+
+        scheme = parts.scheme.lower()
+        netloc = parts.netloc.lower()
+        if ((scheme == 'http' and netloc.endswith(':80'))
+                or (scheme == 'https' and netloc.endswith(':443'))):
+            netloc = netloc.rsplit(':', 1)[0]
+
+        path = parts.path or '/'
+        if len(path) > 1 and path.endswith('/'):
+            path = path.rstrip('/')
+
+        query = urlencode(sorted(
+            (key, value) for key, value in parse_qsl(parts.query)
+            if key not in _TRACKING_PARAMS and not key.startswith('utm_')
+        ))
+
+        return urlunparse((scheme, netloc, path, '', query, ''))
+
+    def _fetch_sub_page(self, url: str) -> Optional[Dict]:
+        """抓取并解析单个子页面（失败返回None）"""
+        try:
+            soup = BeautifulSoup(self._fetch_html(url, timeout=10), _BS_PARSER)
+
+            return {
+                'url': url,
+                'title': self._extract_title(soup),
+                'content': self._extract_content(soup)[:500],  # 子页面只取摘要
+            }
 
-        return sub_pages
+        except Exception as e:
+            self.logger.debug(f"子页面浏览失败 {url}: {e}")
+            return None
+
+    def _browse_sub_pages(self, links: List[Dict], depth: int) -> List[Dict]:
+        """浏览子页面（并发下载，总耗时≈最慢一个请求）"""
+        if depth <= 0:
+            return []
+
+        # 去重后并发抓取（worker数限制了对同一站点的并发压力）
+        to_visit = []
+        for link in links:
+            url = link['url']
+            key = hashlib.blake2b(
+                self._canonicalize(url).encode(), digest_size=8
+            ).digest()
+            if key in self._visited:
+                continue
+            self._visited[key] = None
+            if len(self._visited) > self._max_visited:
+                self._visited.popitem(last=False)
+            to_visit.append(url)
+
+        results = self._fetch_pool.map(self._fetch_sub_page, to_visit)
+        return [page for page in results if page is not None]
 
     # === 智能浏览 ===
 
@@ -295,7 +427,7 @@ class WebScraper:
     def _extract_coin_id(self, url: str) -> Optional[str]:
         """从CoinGecko URL提取代币ID"""
         # 例如：https://www.coingecko.com/en/coins/bitcoin
-        match = re.search(r'/en/coins/([^/]+)', url)
+        match = _COINGECKO_COIN_RE.search(url)
         if match:
             return match.group(1)
         return None
@@ -365,21 +497,14 @@ class WebScraper:
         Returns:
             浏览结果列表
         """
-        results = []
-
-        for url in urls:
+        def browse_one(url: str) -> Dict:
             try:
-                result = self.browse(url, depth=0)
-                results.append(result)
-                time.sleep(1)  # 避免请求过快
-
+                return self.browse(url, depth=0)
             except Exception as e:
-                results.append({
-                    'url': url,
-                    'error': str(e)
-                })
+                return {'url': url, 'error': str(e)}
 
-        return results
+        # 并发浏览，map保持结果与输入URL顺序一致
+        return list(self._fetch_pool.map(browse_one, urls))
 
     # === 工具方法 ===
 
@@ -393,5 +518,5 @@ class WebScraper:
 
     def clean_text(self, html: str) -> str:
         """清理HTML文本"""
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = BeautifulSoup(html, _BS_PARSER)
         return soup.get_text(separator='\n', strip=True)
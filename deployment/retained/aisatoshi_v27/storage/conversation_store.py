@@ -7,13 +7,13 @@ V27核心特性：对话持久化，确保跨部署保留记忆。
 """
 
 import sqlite3
-import json
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
-from .database import Database
+from .database import Database, fts_quote
 from models.memory import ConversationMemory, ConversationSummary
 from core.exceptions import StorageError
 from core.logger import Logger
+from core.utils import json_dumps, json_loads
 
 
 class ConversationStore(Database):
@@ -50,6 +50,36 @@ class ConversationStore(Database):
             """)
             self.execute("CREATE INDEX idx_chat_timestamp ON conversations(chat_id, timestamp)")
 
+        # 角色过滤索引（IF NOT EXISTS：已有的老库升级时也补上）
+        self.execute(
+            "CREATE INDEX IF NOT EXISTS idx_conv_role_id ON conversations(role, id DESC)"
+        )
+
+        # 全文索引（外部内容表，触发器随主表增删同步；
+        # 老库首次升级时创建并整体回填一次）
+        if not self.table_exists("conversations_fts"):
+            self.execute(
+                'CREATE VIRTUAL TABLE conversations_fts USING fts5('
+                'content, content=conversations, content_rowid=id, '
+                'tokenize="unicode61 remove_diacritics 2")'
+            )
+            self.execute("""
+                CREATE TRIGGER conversations_fts_ai AFTER INSERT ON conversations BEGIN
+                    INSERT INTO conversations_fts(rowid, content)
+                    VALUES (new.id, new.content);
+                END
+            """)
+            self.execute("""
+                CREATE TRIGGER conversations_fts_ad AFTER DELETE ON conversations BEGIN
+                    INSERT INTO conversations_fts(conversations_fts, rowid, content)
+                    VALUES ('delete', old.id, old.content);
+                END
+            """)
+            self.execute(
+                "INSERT INTO conversations_fts(rowid, content) "
+                "SELECT id, content FROM conversations"
+            )
+
         # 对话总结表
         if not self.table_exists("conversation_summaries"):
             self.execute("""
@@ -104,6 +134,45 @@ class ConversationStore(Database):
         except sqlite3.Error as e:
             raise StorageError(f"添加对话失败: {e}")
 
+    def add_conversation_pair(self, chat_id: str,
+                              user_message_id: int, user_content: str,
+                              assistant_message_id: int,
+                              assistant_content: str) -> bool:
+        """在一个事务内保存一轮对话（用户消息+AI回复）
+
+        两条INSERT共用一次提交，每轮对话只付一次fsync，
+        而不是逐条自动提交各付一次。
+
+        Args:
+            chat_id: 聊天ID
+            user_message_id: 用户消息ID
+            user_content: 用户消息内容
+            assistant_message_id: AI回复消息ID
+            assistant_content: AI回复内容
+
+        Returns:
+            是否成功
+        """
+        try:
+            timestamp = datetime.now().isoformat()
+            with self.get_connection() as conn:
+                conn.executemany(
+                    """INSERT OR IGNORE INTO conversations
+                    (chat_id, message_id, role, content, timestamp)
+                    VALUES (?, ?, ?, ?, ?)""",
+                    [
+                        (chat_id, user_message_id, 'user',
+                         user_content, timestamp),
+                        (chat_id, assistant_message_id, 'assistant',
+                         assistant_content, timestamp),
+                    ]
+                )
+            self.logger.debug(f"保存对话轮次: {chat_id} - {user_content[:30]}...")
+            return True
+
+        except sqlite3.Error as e:
+            raise StorageError(f"添加对话失败: {e}")
+
     def get_conversation_history(self, chat_id: str, limit: int = 50,
                                  before: Optional[str] = None) -> List[ConversationMemory]:
         """获取对话历史
@@ -116,16 +185,18 @@ class ConversationStore(Database):
         Returns:
             对话列表
         """
+        # 只取需要的列：(chat_id, timestamp)索引倒序走到LIMIT即止，
+        # 不拉id/created_at等用不到的列
         if before:
             rows = self.fetch_all(
-                """SELECT * FROM conversations
+                """SELECT message_id, role, content, timestamp FROM conversations
                 WHERE chat_id = ? AND timestamp < ?
                 ORDER BY timestamp DESC LIMIT ?""",
                 (chat_id, before, limit)
             )
         else:
             rows = self.fetch_all(
-                """SELECT * FROM conversations
+                """SELECT message_id, role, content, timestamp FROM conversations
                 WHERE chat_id = ?
                 ORDER BY timestamp DESC LIMIT ?""",
                 (chat_id, limit)
@@ -133,7 +204,7 @@ class ConversationStore(Database):
 
         return [
             ConversationMemory(
-                chat_id=row['chat_id'],
+                chat_id=chat_id,
                 message_id=row['message_id'],
                 role=row['role'],
                 content=row['content'],
@@ -154,7 +225,7 @@ class ConversationStore(Database):
         """
         cutoff = (datetime.now() - timedelta(hours=hours)).isoformat()
         rows = self.fetch_all(
-            """SELECT * FROM conversations
+            """SELECT message_id, role, content, timestamp FROM conversations
             WHERE chat_id = ? AND timestamp > ?
             ORDER BY timestamp ASC""",
             (chat_id, cutoff)
@@ -162,7 +233,7 @@ class ConversationStore(Database):
 
         return [
             ConversationMemory(
-                chat_id=row['chat_id'],
+                chat_id=chat_id,
                 message_id=row['message_id'],
                 role=row['role'],
                 content=row['content'],
@@ -197,6 +268,27 @@ class ConversationStore(Database):
             for row in rows
         ]
 
+    def get_recent_user_messages(self, limit: int = 100) -> List[str]:
+        """获取最近的用户消息内容
+
+        role过滤下推到SQL、只取content列，学习循环不再
+        先拉全表行再在Python里丢掉一半。
+
+        Args:
+            limit: 最大数量
+
+        Returns:
+            用户消息内容列表（新的在前）
+        """
+        rows = self.fetch_all(
+            """SELECT content FROM conversations
+            WHERE role = 'user'
+            ORDER BY id DESC LIMIT ?""",
+            (limit,)
+        )
+
+        return [row['content'] for row in rows]
+
     def search_conversations(self, query: str, limit: int = 20) -> List[ConversationMemory]:
         """搜索对话
 
@@ -207,12 +299,27 @@ class ConversationStore(Database):
         Returns:
             对话列表
         """
-        rows = self.fetch_all(
-            """SELECT * FROM conversations
-            WHERE content LIKE ?
-            ORDER BY timestamp DESC LIMIT ?""",
-            (f"%{query}%", limit)
-        )
+        # 先走FTS5倒排索引（MATCH+bm25排序），免去全表LIKE扫描。
+        # unicode61不对中文分词，词内子串命中不了索引，
+        # 无命中（或查询含非法MATCH语法）时回退LIKE保证结果不变少
+        try:
+            rows = self.fetch_all(
+                """SELECT c.* FROM conversations_fts f
+                JOIN conversations c ON c.id = f.rowid
+                WHERE conversations_fts MATCH ?
+                ORDER BY bm25(conversations_fts) LIMIT ?""",
+                (fts_quote(query), limit)
+            )
+        except sqlite3.OperationalError:
+            rows = []
+
+        if not rows:
+            rows = self.fetch_all(
+                """SELECT * FROM conversations
+                WHERE content LIKE ?
+                ORDER BY timestamp DESC LIMIT ?""",
+                (f"%{query}%", limit)
+            )
 
         return [
             ConversationMemory(
@@ -283,7 +390,7 @@ class ConversationStore(Database):
                     summary.date,
                     summary.summary,
                     summary.message_count,
-                    json.dumps(summary.key_topics),
+                    json_dumps(summary.key_topics),
                     summary.importance,
                 )
             )
@@ -314,7 +421,7 @@ class ConversationStore(Database):
                 date=row['date'],
                 summary=row['summary'],
                 message_count=row['message_count'],
-                key_topics=json.loads(row['key_topics']) if row['key_topics'] else [],
+                key_topics=json_loads(row['key_topics']) if row['key_topics'] else [],
                 importance=row['importance'],
                 created_at=row['created_at'],
             )
@@ -344,7 +451,7 @@ class ConversationStore(Database):
                 date=row['date'],
                 summary=row['summary'],
                 message_count=row['message_count'],
-                key_topics=json.loads(row['key_topics']) if row['key_topics'] else [],
+                key_topics=json_loads(row['key_topics']) if row['key_topics'] else [],
                 importance=row['importance'],
                 created_at=row['created_at'],
             )
@@ -372,7 +479,7 @@ class ConversationStore(Database):
                 date=row['date'],
                 summary=row['summary'],
                 message_count=row['message_count'],
-                key_topics=json.loads(row['key_topics']) if row['key_topics'] else [],
+                key_topics=json_loads(row['key_topics']) if row['key_topics'] else [],
                 importance=row['importance'],
                 created_at=row['created_at'],
             )
@@ -6,12 +6,121 @@ AIsatoshi V27 - 数据库基类
 
 import sqlite3
 import os
+import queue
+import threading
 from typing import List, Dict, Any, Optional, Tuple
 from contextlib import contextmanager
 from core.exceptions import DatabaseError
 from core.logger import Logger
 
 
+def fts_quote(query: str) -> str:
+    """把原始查询文本包装成FTS5短语
+
+    用户输入可能含MATCH语法字符（引号、AND、-等），
+    整体加双引号按字面短语匹配，内部引号翻倍转义。
+
+    Args:
+        query: 原始查询文本
+
+    Returns:
+        可安全用于MATCH的短语字符串
+    """
+    return '"{}"'.format(query.replace('"', '""'))
+
+
+class ConnectionPool:
+    """SQLite连接池
+
+    每次操作都新建连接的开销（open+PRAGMA握手）在高频
+    读写下很可观。池子预热min_size个连接，按需增长到
+    max_size，连接归还后复用，PRAGMA只在建连时执行一次。
+    """
+
+    def __init__(self, db_path: str, min_size: int = 2, max_size: int = 8):
+        """初始化连接池
+
+        Args:
+            db_path: 数据库文件路径
+            min_size: 预热连接数
+            max_size: 最大连接数
+        """
+        self.db_path = db_path
+        self.max_size = max_size
+        self._pool: queue.Queue = queue.Queue(maxsize=max_size)
+        self._lock = threading.Lock()
+        self._size = 0
+
+        for _ in range(min_size):
+            self._pool.put(self._new_connection())
+            self._size += 1
+
+    def _new_connection(self) -> sqlite3.Connection:
+        """创建新连接并设置PRAGMA"""
+        # 连接会跨线程复用，借出/归还由池子串行化
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # 返回字典式行
+        conn.execute("PRAGMA foreign_keys = ON")  # 启用外键约束
+        conn.execute("PRAGMA journal_mode = WAL")  # WAL模式，提高并发性能
+        conn.execute("PRAGMA synchronous = NORMAL")  # WAL下NORMAL即可保证一致性
+        conn.execute("PRAGMA temp_store = MEMORY")  # 临时表放内存
+        conn.execute("PRAGMA cache_size = -8000")  # 8MB页缓存
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """借出一个连接（必要时新建，池满则等待）
+
+        Returns:
+            数据库连接
+        """
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._size < self.max_size:
+                self._size += 1
+                grow = True
+            else:
+                grow = False
+
+        if grow:
+            try:
+                return self._new_connection()
+            except sqlite3.Error:
+                with self._lock:
+                    self._size -= 1
+                raise
+
+        # 已达上限，等待其他线程归还
+        return self._pool.get()
+
+    def release(self, conn: sqlite3.Connection):
+        """归还连接
+
+        Args:
+            conn: 借出的连接
+        """
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+            with self._lock:
+                self._size -= 1
+
+    def close_all(self):
+        """关闭池中所有空闲连接"""
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._size -= 1
+
+
 class Database:
     """数据库基类
 
@@ -28,6 +137,7 @@ class Database:
         self.db_path = db_path
         self.logger = logger or Logger(name=f"Database-{os.path.basename(db_path)}")
         self._ensure_directory()
+        self._pool = ConnectionPool(db_path)
 
     def _ensure_directory(self):
         """确保数据库目录存在"""
@@ -37,22 +147,23 @@ class Database:
 
     @contextmanager
     def get_connection(self):
-        """获取数据库连接（上下文管理器）"""
-        conn = None
+        """获取数据库连接（上下文管理器）
+
+        从连接池借出，用完归还复用，不再每次操作都重新建连。
+        """
+        conn = self._pool.acquire()
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row  # 返回字典式行
-            conn.execute("PRAGMA foreign_keys = ON")  # 启用外键约束
-            conn.execute("PRAGMA journal_mode = WAL")  # WAL模式，提高并发性能
             yield conn
             conn.commit()
         except sqlite3.Error as e:
-            if conn:
-                conn.rollback()
+            conn.rollback()
             raise DatabaseError(f"数据库操作失败: {e}")
         finally:
-            if conn:
-                conn.close()
+            self._pool.release(conn)
+
+    def close(self):
+        """关闭数据库连接池"""
+        self._pool.close_all()
 
     def execute(self, sql: str, params: Tuple = ()) -> sqlite3.Cursor:
         """执行SQL语句
@@ -7,13 +7,13 @@ V27核心特性：进化记录持久化，确保学习内容不丢失。
 """
 
 import sqlite3
-import json
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from .database import Database
 from models.evolution import Pattern, Method, Knowledge, EvolutionSummary
 from core.exceptions import EvolutionError
 from core.logger import Logger
+from core.utils import json_dumps, json_loads
 
 
 class EvolutionStore(Database):
@@ -149,6 +149,40 @@ class EvolutionStore(Database):
             self.logger.error(f"保存模式失败: {e}")
             raise EvolutionError(f"保存模式失败: {e}")
 
+    def add_patterns_bulk(self, rows: List[tuple]) -> int:
+        """批量添加或更新模式
+
+        所有行在一个事务里用executemany+upsert落盘，
+        一次提交代替逐条的查询+写入往返。同一模式由调用方
+        预先聚合好计数，每个模式只写一行。
+
+        Args:
+            rows: (pattern, category, confidence, frequency)元组列表
+
+        Returns:
+            处理的行数
+        """
+        if not rows:
+            return 0
+
+        try:
+            with self.get_connection() as conn:
+                conn.executemany(
+                    """INSERT INTO patterns (pattern, category, confidence, frequency)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(pattern) DO UPDATE SET
+                        frequency = frequency + excluded.frequency,
+                        last_seen = CURRENT_TIMESTAMP,
+                        confidence = excluded.confidence""",
+                    rows
+                )
+            self.logger.debug(f"批量保存模式: {len(rows)}条")
+            return len(rows)
+
+        except sqlite3.Error as e:
+            self.logger.error(f"保存模式失败: {e}")
+            raise EvolutionError(f"保存模式失败: {e}")
+
     def get_patterns(self, category: Optional[str] = None,
                     min_frequency: int = 1,
                     limit: int = 100) -> List[Pattern]:
@@ -187,7 +221,7 @@ class EvolutionStore(Database):
                 last_seen=row['last_seen'],
                 confidence=row['confidence'],
                 category=row['category'] or "",
-                metadata=json.loads(row['metadata']) if row['metadata'] else {},
+                metadata=json_loads(row['metadata']) if row['metadata'] else {},
             )
             for row in rows
         ]
@@ -210,7 +244,7 @@ class EvolutionStore(Database):
             cursor = self.execute(
                 """INSERT INTO methods (task_type, method, steps)
                 VALUES (?, ?, ?)""",
-                (task_type, method, json.dumps(steps))
+                (task_type, method, json_dumps(steps))
             )
             self.logger.debug(f"新方法已学习: {method[:50]}...")
             return cursor.lastrowid
@@ -241,7 +275,7 @@ class EvolutionStore(Database):
                 id=row['id'],
                 task_type=row['task_type'],
                 method=row['method'],
-                steps=json.loads(row['steps']) if row['steps'] else [],
+                steps=json_loads(row['steps']) if row['steps'] else [],
                 success_count=row['success_count'],
                 failure_count=row['failure_count'],
                 last_used=row['last_used'],
@@ -322,6 +356,34 @@ class EvolutionStore(Database):
             self.logger.error(f"保存知识失败: {e}")
             raise EvolutionError(f"保存知识失败: {e}")
 
+    def add_knowledge_bulk(self, rows: List[tuple]) -> int:
+        """批量添加知识
+
+        所有行在一个事务里用executemany落盘，一次提交。
+
+        Args:
+            rows: (topic, content, confidence, source)元组列表
+
+        Returns:
+            处理的行数
+        """
+        if not rows:
+            return 0
+
+        try:
+            with self.get_connection() as conn:
+                conn.executemany(
+                    """INSERT INTO knowledge (topic, content, confidence, source)
+                    VALUES (?, ?, ?, ?)""",
+                    rows
+                )
+            self.logger.debug(f"批量保存知识: {len(rows)}条")
+            return len(rows)
+
+        except sqlite3.Error as e:
+            self.logger.error(f"保存知识失败: {e}")
+            raise EvolutionError(f"保存知识失败: {e}")
+
     def search_knowledge(self, query: str, limit: int = 10) -> List[Knowledge]:
         """搜索知识
 
@@ -350,7 +412,7 @@ class EvolutionStore(Database):
                 created_at=row['created_at'],
                 updated_at=row['updated_at'],
                 verified=bool(row['verified']),
-                references=json.loads(row['references']) if row['references'] else [],
+                references=json_loads(row['references']) if row['references'] else [],
             )
             for row in rows
         ]
@@ -391,7 +453,7 @@ class EvolutionStore(Database):
                 created_at=row['created_at'],
                 updated_at=row['updated_at'],
                 verified=bool(row['verified']),
-                references=json.loads(row['references']) if row['references'] else [],
+                references=json_loads(row['references']) if row['references'] else [],
             )
             for row in rows
         ]
@@ -426,7 +488,7 @@ class EvolutionStore(Database):
                     period,
                     date,
                     summary,
-                    json.dumps(insights) if insights else None,
+                    json_dumps(insights) if insights else None,
                     patterns_learned,
                     methods_learned,
                     conversations_processed,
@@ -461,7 +523,7 @@ class EvolutionStore(Database):
                 period=row['period'],
                 date=row['date'],
                 summary=row['summary'],
-                insights=json.loads(row['insights']) if row['insights'] else [],
+                insights=json_loads(row['insights']) if row['insights'] else [],
                 patterns_learned=row['patterns_learned'],
                 methods_learned=row['methods_learned'],
                 conversations_processed=row['conversations_processed'],
@@ -6,14 +6,23 @@ AIsatoshi V27 - 记忆存储
 V27核心特性：记忆持久化，确保跨部署保留所有记忆。
 """
 
+import heapq
+import math
 import sqlite3
-import json
+import time
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-from .database import Database
+from .database import Database, fts_quote
 from models.memory import Memory, Fact, MemoryAssociation
 from core.exceptions import MemoryStoreError
 from core.logger import Logger
+from core.utils import json_dumps, json_loads
+
+# 可选依赖：numpy可用时检索打分走向量化路径，未安装时回退纯Python
+try:
+    import numpy as _np
+except ImportError:
+    _np = None
 
 
 class MemoryStore(Database):
@@ -32,6 +41,26 @@ class MemoryStore(Database):
         super().__init__(db_path, logger)
         self._init_tables()
 
+        # 关联图的内存镜像：(memory_id, associated_id) -> strength
+        # 启动时整体加载一次，检索打分时单次dict查找代替扫描对象列表
+        self._assoc_map: Dict[tuple, float] = {}
+        self._load_associations()
+
+        # SoA镜像（按列存储）：打分循环只碰平铺数组，不逐对象取属性
+        # 写入后置脏，下次rank_memories时整体重建
+        self._soa_dirty = True
+        self._soa_ids: Any = ()
+        self._soa_epochs: Any = ()
+        self._soa_importance: Any = ()
+        self._soa_contents: List[str] = []
+
+        # 向量镜像：有embedding的记忆整体加载成矩阵，
+        # kNN检索在内存里算余弦，不逐行解析JSON
+        self._vec_dirty = True
+        self._vec_mat: Any = ()
+        self._vec_ids: List[int] = []
+        self._vec_contents: List[str] = []
+
     def _init_tables(self):
         """初始化数据库表"""
         # 记忆表
@@ -68,6 +97,39 @@ class MemoryStore(Database):
             """)
             self.execute("CREATE INDEX idx_assoc_strength ON memory_associations(strength)")
 
+        # 全文索引（外部内容表，触发器随主表增删改同步；
+        # 老库首次升级时创建并整体回填一次）
+        if not self.table_exists("memories_fts"):
+            self.execute(
+                'CREATE VIRTUAL TABLE memories_fts USING fts5('
+                'content, content=memories, content_rowid=id, '
+                'tokenize="unicode61 remove_diacritics 2")'
+            )
+            self.execute("""
+                CREATE TRIGGER memories_fts_ai AFTER INSERT ON memories BEGIN
+                    INSERT INTO memories_fts(rowid, content)
+                    VALUES (new.id, new.content);
+                END
+            """)
+            self.execute("""
+                CREATE TRIGGER memories_fts_ad AFTER DELETE ON memories BEGIN
+                    INSERT INTO memories_fts(memories_fts, rowid, content)
+                    VALUES ('delete', old.id, old.content);
+                END
+            """)
+            self.execute("""
+                CREATE TRIGGER memories_fts_au AFTER UPDATE OF content ON memories BEGIN
+                    INSERT INTO memories_fts(memories_fts, rowid, content)
+                    VALUES ('delete', old.id, old.content);
+                    INSERT INTO memories_fts(rowid, content)
+                    VALUES (new.id, new.content);
+                END
+            """)
+            self.execute(
+                "INSERT INTO memories_fts(rowid, content) "
+                "SELECT id, content FROM memories"
+            )
+
         # 身份信息表（存储AIsatoshi的身份信息）
         if not self.table_exists("identity"):
             self.execute("""
@@ -78,6 +140,16 @@ class MemoryStore(Database):
                 )
             """)
 
+        # 偏好表（key是归一化内容的哈希，重复写入幂等）
+        if not self.table_exists("preferences"):
+            self.execute("""
+                CREATE TABLE preferences (
+                    key TEXT PRIMARY KEY,
+                    content TEXT NOT NULL,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
         self.logger.debug("记忆数据库表初始化完成")
 
     # === 记忆操作 ===
@@ -100,11 +172,13 @@ class MemoryStore(Database):
                     memory.type,
                     memory.content,
                     memory.importance,
-                    json.dumps(memory.metadata) if memory.metadata else None,
-                    json.dumps(memory.tags) if memory.tags else None,
+                    json_dumps(memory.metadata) if memory.metadata else None,
+                    json_dumps(memory.tags) if memory.tags else None,
                 )
             )
             memory_id = cursor.lastrowid
+            self._soa_dirty = True
+            self._vec_dirty = True
             self.logger.memory_saved(memory.type)
             return memory_id
 
@@ -112,6 +186,47 @@ class MemoryStore(Database):
             self.logger.error(f"添加记忆失败: {e}")
             raise MemoryStoreError(f"添加记忆失败: {e}")
 
+    def add_memories_bulk(self, memories: List[Memory]) -> int:
+        """批量添加记忆（单事务executemany，一次提交）
+
+        逐条add_memory每条各付一次提交（fsync），批量导入
+        （如转写稿摄取）时改走这里。
+
+        Args:
+            memories: 记忆对象列表
+
+        Returns:
+            写入数量
+        """
+        if not memories:
+            return 0
+
+        try:
+            with self.get_connection() as conn:
+                conn.executemany(
+                    """INSERT INTO memories
+                    (type, content, importance, metadata, tags)
+                    VALUES (?, ?, ?, ?, ?)""",
+                    [
+                        (
+                            memory.type,
+                            memory.content,
+                            memory.importance,
+                            json_dumps(memory.metadata) if memory.metadata else None,
+                            json_dumps(memory.tags) if memory.tags else None,
+                        )
+                        for memory in memories
+                    ]
+                )
+            self._soa_dirty = True
+            self._vec_dirty = True
+            self.logger.debug(f"批量添加记忆: {len(memories)}条")
+            return len(memories)
+
+        except sqlite3.Error as e:
+            self.logger.error(f"添加记忆失败: {e}")
+            raise MemoryStoreError(f"添加记忆失败: {e}")
+
     def get_memory(self, memory_id: int) -> Optional[Memory]:
         """获取记忆
 
@@ -131,8 +246,8 @@ class MemoryStore(Database):
                 importance=row['importance'],
                 created_at=row['created_at'],
                 updated_at=row['updated_at'],
-                metadata=json.loads(row['metadata']) if row['metadata'] else {},
-                tags=json.loads(row['tags']) if row['tags'] else [],
+                metadata=json_loads(row['metadata']) if row['metadata'] else {},
+                tags=json_loads(row['tags']) if row['tags'] else [],
             )
         return None
 
@@ -150,18 +265,41 @@ class MemoryStore(Database):
         Returns:
             记忆列表
         """
-        # 构建SQL查询
-        conditions = ["content LIKE ?", "importance >= ?"]
-        params = [f"%{query}%", min_importance]
+        # 先走FTS5倒排索引（MATCH+bm25排序），免去全表LIKE扫描。
+        # unicode61不对中文分词，词内子串命中不了索引，
+        # 无命中（或查询含非法MATCH语法）时回退LIKE保证结果不变少
+        conditions = ["m.importance >= ?"]
+        params: List[Any] = [fts_quote(query), min_importance]
 
         if memory_type:
-            conditions.append("type = ?")
+            conditions.append("m.type = ?")
             params.append(memory_type)
 
-        sql = f"SELECT * FROM memories WHERE {' AND '.join(conditions)} ORDER BY importance DESC, created_at DESC LIMIT ?"
+        sql = (
+            "SELECT m.* FROM memories_fts f "
+            "JOIN memories m ON m.id = f.rowid "
+            f"WHERE memories_fts MATCH ? AND {' AND '.join(conditions)} "
+            "ORDER BY bm25(memories_fts) LIMIT ?"
+        )
         params.append(limit)
 
-        rows = self.fetch_all(sql, tuple(params))
+        try:
+            rows = self.fetch_all(sql, tuple(params))
+        except sqlite3.OperationalError:
+            rows = []
+
+        if not rows:
+            conditions = ["content LIKE ?", "importance >= ?"]
+            params = [f"%{query}%", min_importance]
+
+            if memory_type:
+                conditions.append("type = ?")
+                params.append(memory_type)
+
+            sql = f"SELECT * FROM memories WHERE {' AND '.join(conditions)} ORDER BY importance DESC, created_at DESC LIMIT ?"
+            params.append(limit)
+
+            rows = self.fetch_all(sql, tuple(params))
 
         return [
             Memory(
@@ -171,8 +309,8 @@ class MemoryStore(Database):
                 importance=row['importance'],
                 created_at=row['created_at'],
                 updated_at=row['updated_at'],
-                metadata=json.loads(row['metadata']) if row['metadata'] else {},
-                tags=json.loads(row['tags']) if row['tags'] else [],
+                metadata=json_loads(row['metadata']) if row['metadata'] else {},
+                tags=json_loads(row['tags']) if row['tags'] else [],
             )
             for row in rows
         ]
@@ -207,8 +345,8 @@ class MemoryStore(Database):
                 importance=row['importance'],
                 created_at=row['created_at'],
                 updated_at=row['updated_at'],
-                metadata=json.loads(row['metadata']) if row['metadata'] else {},
-                tags=json.loads(row['tags']) if row['tags'] else [],
+                metadata=json_loads(row['metadata']) if row['metadata'] else {},
+                tags=json_loads(row['tags']) if row['tags'] else [],
             )
             for row in rows
         ]
@@ -240,8 +378,8 @@ class MemoryStore(Database):
                 importance=row['importance'],
                 created_at=row['created_at'],
                 updated_at=row['updated_at'],
-                metadata=json.loads(row['metadata']) if row['metadata'] else {},
-                tags=json.loads(row['tags']) if row['tags'] else [],
+                metadata=json_loads(row['metadata']) if row['metadata'] else {},
+                tags=json_loads(row['tags']) if row['tags'] else [],
             )
             for row in rows
         ]
@@ -278,6 +416,8 @@ class MemoryStore(Database):
                 f"UPDATE memories SET {', '.join(updates)} WHERE id = ?",
                 tuple(params)
             )
+            self._soa_dirty = True
+            self._vec_dirty = True
             return True
 
         except sqlite3.Error as e:
@@ -295,12 +435,369 @@ class MemoryStore(Database):
         """
         try:
             self.execute("DELETE FROM memories WHERE id = ?", (memory_id,))
+            self._soa_dirty = True
+            self._vec_dirty = True
             return True
 
         except sqlite3.Error as e:
             self.logger.error(f"删除记忆失败: {e}")
             raise MemoryStoreError(f"删除记忆失败: {e}")
 
+    # === 记忆排序（SoA打分） ===
+
+    def _refresh_soa(self):
+        """重建SoA镜像
+
+        把全表的epoch/重要性/内容拉成平铺的按列数组，
+        打分时顺序扫描数组，不再逐行构造Memory对象。
+        """
+        rows = self.fetch_all(
+            "SELECT id, importance, content, created_at FROM memories"
+        )
+
+        ids = []
+        importances = []
+        epochs = []
+        contents = []
+        for row in rows:
+            try:
+                epoch = datetime.fromisoformat(row['created_at']).timestamp()
+            except (TypeError, ValueError):
+                epoch = 0.0
+            ids.append(row['id'])
+            importances.append(row['importance'])
+            epochs.append(epoch)
+            contents.append(row['content'])
+
+        if _np is not None:
+            self._soa_ids = _np.array(ids, dtype=_np.int64)
+            self._soa_importance = _np.array(importances, dtype=_np.int8)
+            self._soa_epochs = _np.array(epochs, dtype=_np.float64)
+        else:
+            self._soa_ids = ids
+            self._soa_importance = importances
+            self._soa_epochs = epochs
+        self._soa_contents = contents
+        self._soa_dirty = False
+
+    def rank_memories(self, k: int = 10, min_importance: int = 1,
+                      tau: float = 7 * 86400.0) -> List[str]:
+        """按时间衰减+重要性加权打分，返回top-k记忆内容
+
+        打分公式：score = exp(-(now - created_epoch) / tau) + importance * 0.1
+        numpy可用时整批向量化计算并用argpartition取top-k，
+        否则用heapq在纯Python数组上选出top-k。
+
+        Args:
+            k: 返回数量
+            min_importance: 最小重要性过滤
+            tau: 衰减时间常数（秒），默认7天
+
+        Returns:
+            按得分降序的记忆内容列表
+        """
+        if self._soa_dirty:
+            self._refresh_soa()
+
+        if not self._soa_contents or k <= 0:
+            return []
+
+        now = time.time()
+
+        if _np is not None:
+            decay = _np.exp(-(now - self._soa_epochs) / tau)
+            scores = decay + self._soa_importance.astype(_np.float64) * 0.1
+            if min_importance > 1:
+                scores = _np.where(
+                    self._soa_importance >= min_importance, scores, -_np.inf
+                )
+            top_k = min(k, scores.size)
+            idx = _np.argpartition(-scores, top_k - 1)[:top_k]
+            idx = idx[_np.argsort(-scores[idx])]
+            return [
+                self._soa_contents[i] for i in idx
+                if scores[i] != -_np.inf
+            ]
+
+        # 回退：纯Python打分
+        scored = (
+            (math.exp(-(now - epoch) / tau) + importance * 0.1, content)
+            for epoch, importance, content in zip(
+                self._soa_epochs, self._soa_importance, self._soa_contents
+            )
+            if importance >= min_importance
+        )
+        top = heapq.nlargest(k, scored, key=lambda item: item[0])
+        return [content for _, content in top]
+
+    # === 向量检索 ===
+
+    def set_embedding(self, memory_id: int, embedding: List[float]) -> bool:
+        """保存记忆的向量表示
+
+        Args:
+            memory_id: 记忆ID
+            embedding: 归一化后的向量
+
+        Returns:
+            是否成功
+        """
+        try:
+            self.execute(
+                "UPDATE memories SET embedding = ? WHERE id = ?",
+                (json_dumps(embedding), memory_id)
+            )
+            self._vec_dirty = True
+            return True
+
+        except sqlite3.Error as e:
+            self.logger.error(f"保存向量失败: {e}")
+            raise MemoryStoreError(f"保存向量失败: {e}")
+
+    def _refresh_vecs(self):
+        """重建向量镜像
+
+        把所有带embedding的记忆解析成矩阵（numpy可用时）
+        或列表的列表，检索时只做点积，不再逐行解析JSON。
+        """
+        rows = self.fetch_all(
+            "SELECT id, content, embedding FROM memories WHERE embedding IS NOT NULL"
+        )
+
+        ids = []
+        contents = []
+        vectors = []
+        for row in rows:
+            try:
+                vec = json_loads(row['embedding'])
+            except (TypeError, ValueError):
+                continue
+            # 重建时统一归一化（零向量丢弃）：
+            # 检索阶段点积即余弦，不再逐查询算norm
+            norm = math.sqrt(sum(x * x for x in vec))
+            if norm == 0.0:
+                continue
+            ids.append(row['id'])
+            contents.append(row['content'])
+            vectors.append([x / norm for x in vec])
+
+        if _np is not None and vectors:
+            self._vec_mat = _np.array(vectors, dtype=_np.float32)
+        else:
+            self._vec_mat = vectors
+        self._vec_ids = ids
+        self._vec_contents = contents
+        self._vec_dirty = False
+
+    def vector_search(self, query_vec: List[float], k: int = 5,
+                      min_score: float = 0.3) -> List[str]:
+        """按余弦相似度返回top-k记忆内容
+
+        向量写入时已归一化，余弦相似度即点积。
+        numpy可用时整批矩阵乘并用argpartition取top-k，
+        否则heapq在纯Python列表上选出top-k。
+
+        Args:
+            query_vec: 归一化的查询向量
+            k: 返回数量
+            min_score: 最低相似度阈值
+
+        Returns:
+            按相似度降序的记忆内容列表
+        """
+        positions = self._vector_rank(query_vec, k, min_score)
+        return [self._vec_contents[i] for i in positions]
+
+    def _vector_rank(self, query_vec: List[float], k: int,
+                     min_score: float) -> List[int]:
+        """向量打分，返回按相似度降序的镜像下标"""
+        if self._vec_dirty:
+            self._refresh_vecs()
+
+        if not self._vec_contents or k <= 0:
+            return []
+
+        if _np is not None:
+            scores = self._vec_mat @ _np.asarray(query_vec, dtype=_np.float32)
+            top_k = min(k, scores.size)
+            idx = _np.argpartition(-scores, top_k - 1)[:top_k]
+            idx = idx[_np.argsort(-scores[idx])]
+            return [int(i) for i in idx if scores[i] >= min_score]
+
+        # 回退：纯Python点积
+        scored = (
+            (sum(a * b for a, b in zip(vec, query_vec)), i)
+            for i, vec in enumerate(self._vec_mat)
+        )
+        top = heapq.nlargest(k, scored, key=lambda item: item[0])
+        return [i for score, i in top if score >= min_score]
+
+    def hybrid_search(self, query: str, limit: int = 20,
+                      query_vec: Optional[List[float]] = None) -> List[Memory]:
+        """关键词+向量混合检索（倒数排名融合）
+
+        纯向量会漏掉精确的名称/ID，纯关键词会漏掉换种说法的
+        表达；两路各取排名后按RRF（score = Σ 1/(60+rank)）融合，
+        合并成本只有O(k)。query_vec缺省（编码器不可用）时
+        退化为纯关键词检索。
+
+        Args:
+            query: 搜索关键词
+            limit: 最大数量
+            query_vec: 归一化的查询向量（可选）
+
+        Returns:
+            按融合得分降序的记忆列表
+        """
+        rrf_scores: Dict[int, float] = {}
+
+        keyword_ids = self._keyword_rank_ids(query, limit)
+        for rank, memory_id in enumerate(keyword_ids):
+            rrf_scores[memory_id] = rrf_scores.get(memory_id, 0.0) \
+                + 1.0 / (60 + rank)
+
+        if query_vec is not None:
+            positions = self._vector_rank(query_vec, limit, min_score=0.3)
+            for rank, pos in enumerate(positions):
+                memory_id = self._vec_ids[pos]
+                rrf_scores[memory_id] = rrf_scores.get(memory_id, 0.0) \
+                    + 1.0 / (60 + rank)
+
+        if not rrf_scores:
+            return []
+
+        top_ids = heapq.nlargest(
+            limit, rrf_scores, key=rrf_scores.get
+        )
+
+        # 一次IN查询取回所有行，再按融合得分顺序输出
+        placeholders = ",".join("?" * len(top_ids))
+        rows = self.fetch_all(
+            f"SELECT * FROM memories WHERE id IN ({placeholders})",
+            tuple(top_ids)
+        )
+        by_id = {row['id']: row for row in rows}
+
+        return [
+            Memory(
+                id=row['id'],
+                type=row['type'],
+                content=row['content'],
+                importance=row['importance'],
+                created_at=row['created_at'],
+                updated_at=row['updated_at'],
+                metadata=json_loads(row['metadata']) if row['metadata'] else {},
+                tags=json_loads(row['tags']) if row['tags'] else [],
+            )
+            for row in (
+                by_id[memory_id] for memory_id in top_ids
+                if memory_id in by_id
+            )
+        ]
+
+    def _keyword_rank_ids(self, query: str, limit: int) -> List[int]:
+        """FTS5关键词检索，返回按bm25升序的记忆ID（LIKE回退）"""
+        try:
+            rows = self.fetch_all(
+                """SELECT f.rowid AS id FROM memories_fts f
+                WHERE memories_fts MATCH ?
+                ORDER BY bm25(memories_fts) LIMIT ?""",
+                (fts_quote(query), limit)
+            )
+        except sqlite3.OperationalError:
+            rows = []
+
+        if not rows:
+            rows = self.fetch_all(
+                """SELECT id FROM memories WHERE content LIKE ?
+                ORDER BY importance DESC, created_at DESC LIMIT ?""",
+                (f"%{query}%", limit)
+            )
+
+        return [row['id'] for row in rows]
+
+    # === 记忆关联操作 ===
+
+    def _load_associations(self):
+        """加载关联图到内存镜像"""
+        rows = self.fetch_all(
+            "SELECT memory_id, associated_id, strength FROM memory_associations"
+        )
+        self._assoc_map = {
+            (row['memory_id'], row['associated_id']): row['strength']
+            for row in rows
+        }
+
+    def add_association(self, association: MemoryAssociation) -> bool:
+        """添加或更新记忆关联
+
+        Args:
+            association: 关联对象
+
+        Returns:
+            是否成功
+        """
+        try:
+            self.execute(
+                """INSERT OR REPLACE INTO memory_associations
+                (memory_id, associated_id, strength, created_at)
+                VALUES (?, ?, ?, ?)""",
+                (
+                    association.memory_id,
+                    association.associated_id,
+                    association.strength,
+                    association.created_at,
+                )
+            )
+            self._assoc_map[
+                (association.memory_id, association.associated_id)
+            ] = association.strength
+            return True
+
+        except sqlite3.Error as e:
+            self.logger.error(f"添加记忆关联失败: {e}")
+            raise MemoryStoreError(f"添加记忆关联失败: {e}")
+
+    def get_association_strength(self, memory_id: int,
+                                 associated_id: int) -> float:
+        """获取两个记忆间的关联强度
+
+        打分热路径：直接查内存镜像，不回数据库。
+
+        Args:
+            memory_id: 记忆ID
+            associated_id: 关联记忆ID
+
+        Returns:
+            关联强度（无关联时为0.0）
+        """
+        return self._assoc_map.get((memory_id, associated_id), 0.0)
+
+    def get_associations(self, memory_id: int) -> List[MemoryAssociation]:
+        """获取某条记忆的所有关联
+
+        Args:
+            memory_id: 记忆ID
+
+        Returns:
+            关联列表
+        """
+        rows = self.fetch_all(
+            """SELECT * FROM memory_associations
+            WHERE memory_id = ? ORDER BY strength DESC""",
+            (memory_id,)
+        )
+
+        return [
+            MemoryAssociation(
+                memory_id=row['memory_id'],
+                associated_id=row['associated_id'],
+                strength=row['strength'],
+                created_at=row['created_at'],
+            )
+            for row in rows
+        ]
+
     # === 身份信息操作 ===
 
     def set_identity(self, key: str, value: str) -> bool:
@@ -348,6 +845,44 @@ class MemoryStore(Database):
         rows = self.fetch_all("SELECT key, value FROM identity")
         return {row['key']: row['value'] for row in rows}
 
+    # === 偏好操作 ===
+
+    def add_preference(self, key: str, content: str) -> bool:
+        """保存偏好（同key重复写入被忽略，幂等）
+
+        Args:
+            key: 归一化内容的哈希键
+            content: 偏好内容
+
+        Returns:
+            是否新增（已存在时返回False）
+        """
+        try:
+            cursor = self.execute(
+                "INSERT OR IGNORE INTO preferences (key, content) VALUES (?, ?)",
+                (key, content)
+            )
+            return cursor.rowcount > 0
+
+        except sqlite3.Error as e:
+            self.logger.error(f"保存偏好失败: {e}")
+            raise MemoryStoreError(f"保存偏好失败: {e}")
+
+    def get_preferences(self, limit: int = 100) -> List[str]:
+        """获取所有偏好（新的在前）
+
+        Args:
+            limit: 最大数量
+
+        Returns:
+            偏好内容列表
+        """
+        rows = self.fetch_all(
+            "SELECT content FROM preferences ORDER BY created_at DESC, rowid DESC LIMIT ?",
+            (limit,)
+        )
+        return [row['content'] for row in rows]
+
     # === 统计 ===
 
     def get_memory_count(self, memory_type: Optional[str] = None) -> int:
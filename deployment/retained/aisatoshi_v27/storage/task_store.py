@@ -7,13 +7,21 @@ V27核心特性：任务持久化，确保重启后任务自动恢复。
 """
 
 import sqlite3
-import json
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from .database import Database
-from models.task import Task, TaskStatus, TaskExecution
+from models.task import Task, TaskExecution, COMPLETED
 from core.exceptions import TaskStoreError
 from core.logger import Logger
+from core.utils import json_loads
+
+
+# 任务落盘SQL（save_task与save_many共用，列序与Task.to_tuple一致）
+_SAVE_TASK_SQL = """INSERT OR REPLACE INTO tasks
+    (id, type, name, description, status, priority, params, interval,
+     next_run, created_at, updated_at, completed_at, result, error,
+     execution_count, last_execution)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
 
 
 class TaskStore(Database):
@@ -90,31 +98,7 @@ class TaskStore(Database):
             是否成功
         """
         try:
-            self.execute(
-                """INSERT OR REPLACE INTO tasks
-                (id, type, name, description, status, priority, params, interval,
-                 next_run, created_at, updated_at, completed_at, result, error,
-                 execution_count, last_execution)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (
-                    task.id,
-                    task.type,
-                    task.name,
-                    task.description,
-                    task.status,
-                    task.priority,
-                    json.dumps(task.params) if task.params else None,
-                    task.interval,
-                    task.next_run,
-                    task.created_at,
-                    task.updated_at,
-                    task.completed_at,
-                    task.result,
-                    task.error,
-                    task.execution_count,
-                    task.last_execution,
-                )
-            )
+            self.execute(_SAVE_TASK_SQL, task.to_tuple())
             self.logger.task_created(task.id, task.name)
             return True
 
@@ -122,6 +106,33 @@ class TaskStore(Database):
             self.logger.error(f"保存任务失败: {e}")
             raise TaskStoreError(f"保存任务失败: {e}")
 
+    def save_many(self, tasks: List[Task]) -> bool:
+        """批量保存任务
+
+        用Task.to_tuple直接喂executemany，单事务落盘，
+        不经过中间字典。
+
+        Args:
+            tasks: 任务列表
+
+        Returns:
+            是否成功
+        """
+        if not tasks:
+            return True
+
+        try:
+            with self.get_connection() as conn:
+                conn.executemany(
+                    _SAVE_TASK_SQL, [task.to_tuple() for task in tasks]
+                )
+            self.logger.debug(f"批量保存任务: {len(tasks)}个")
+            return True
+
+        except sqlite3.Error as e:
+            self.logger.error(f"保存任务失败: {e}")
+            raise TaskStoreError(f"保存任务失败: {e}")
+
     def get_task(self, task_id: str) -> Optional[Task]:
         """获取任务
 
@@ -141,7 +152,7 @@ class TaskStore(Database):
                 description=row['description'] or "",
                 status=row['status'],
                 priority=row['priority'],
-                params=json.loads(row['params']) if row['params'] else {},
+                params=json_loads(row['params']) if row['params'] else {},
                 interval=row['interval'],
                 next_run=row['next_run'],
                 created_at=row['created_at'],
@@ -181,7 +192,7 @@ class TaskStore(Database):
                 description=row['description'] or "",
                 status=row['status'],
                 priority=row['priority'],
-                params=json.loads(row['params']) if row['params'] else {},
+                params=json_loads(row['params']) if row['params'] else {},
                 interval=row['interval'],
                 next_run=row['next_run'],
                 created_at=row['created_at'],
@@ -217,7 +228,7 @@ class TaskStore(Database):
                 description=row['description'] or "",
                 status=row['status'],
                 priority=row['priority'],
-                params=json.loads(row['params']) if row['params'] else {},
+                params=json_loads(row['params']) if row['params'] else {},
                 interval=row['interval'],
                 next_run=row['next_run'],
                 created_at=row['created_at'],
@@ -248,7 +259,7 @@ class TaskStore(Database):
         try:
             updated_at = datetime.now().isoformat()
 
-            if status == TaskStatus.COMPLETED.value:
+            if status == COMPLETED:
                 completed_at = updated_at
                 self.execute(
                     """UPDATE tasks SET status = ?, updated_at = ?,